@@ -0,0 +1,72 @@
+import time
+from dataclasses import dataclass
+
+import pygame
+
+from .surface_cache import surface_bytes
+
+
+@dataclass
+class AssetRecord:
+    path: str
+    alpha: bool
+    size: tuple
+    nbytes: int
+    load_ms: float
+
+
+class AssetRegistry:
+    """Decodes each (path, format, size) once and hands out the same Surface to everyone.
+
+    Surfaces are converted to the display format, so a display mode has to be set
+    before the first load. They are shared: blit them, never draw on them.
+    """
+
+    def __init__(self):
+        self._surfaces = dict()
+        self.records = dict()
+
+    def load(self, path, alpha=False, size=None):
+        key = (str(path), alpha, tuple(size) if size else None)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            return surface
+
+        start = time.perf_counter()
+        # Scaled variants reuse the full size decode if someone holds it, but don't keep
+        # it around just for themselves
+        surface = self._surfaces.get((key[0], alpha, None))
+        if surface is None:
+            surface = pygame.image.load(key[0])
+            surface = surface.convert_alpha() if alpha else surface.convert()
+        if size and surface.get_size() != key[2]:
+            surface = pygame.transform.scale(surface, key[2])
+
+        self._surfaces[key] = surface
+        self.records[key] = AssetRecord(key[0], alpha, key[2], surface_bytes(surface),
+                                        (time.perf_counter() - start) * 1000)
+        return surface
+
+    def discard(self, path, alpha=False, size=None):
+        # For decodes only needed to make a variant, e.g. a full size sheet once it is scaled
+        key = (str(path), alpha, tuple(size) if size else None)
+        self._surfaces.pop(key, None)
+        self.records.pop(key, None)
+
+    def total_bytes(self):
+        return sum(r.nbytes for r in self.records.values())
+
+    def report(self):
+        for record in sorted(self.records.values(), key=lambda r: r.nbytes, reverse=True):
+            size = '{}x{}'.format(*record.size) if record.size else 'native'
+            print(f"{record.path} [{'alpha' if record.alpha else 'opaque'}, {size}]: "
+                  f"{record.nbytes / 1024:.0f} KB, loaded in {record.load_ms:.1f} ms")
+        print(f"{len(self.records)} assets, {self.total_bytes() / 2 ** 20:.1f} MB resident")
+
+    def clear(self):
+        self._surfaces.clear()
+        self.records.clear()
+
+
+# Shared by all games
+registry = AssetRegistry()
@@ -0,0 +1,173 @@
+"""Compile a flashcard deck folder into a single memory mapped card pack.
+
+A pack stores every card of a deck pre-scaled to the requested resolutions as raw
+RGB pixels, so the game can build Surfaces straight from the mapped file instead of
+decoding GIF/PNG/JPEG at launch and on every card flip.
+
+Layout: a fixed header (magic, version, index offset and length), the pixel data
+and then a JSON index. The index maps each source to its mtime and, per resolution,
+the offset and dimensions of its pixels. Writing the index last lets the builder
+stream pixels to disk one card at a time.
+
+    python -m baby_games.core.card_pack static/flashcards/<deck> --size 800x600
+"""
+import argparse
+import glob
+import json
+import mmap
+import os
+import struct
+
+import pygame
+
+from .surface_cache import SCALE_MODES
+
+
+MAGIC = b'BGCARDPK'
+VERSION = 1
+HEADER = struct.Struct('<8sIQQ')
+PIXEL_FORMAT = 'RGB'
+PACK_SUFFIX = '.cardpack'
+
+
+def size_key(size):
+    return '{}x{}'.format(*size)
+
+
+def pack_path_for(deck_dir):
+    return os.path.normpath(deck_dir) + PACK_SUFFIX
+
+
+def build_pack(deck_dir, sizes, pack_path=None, scale_mode='SCALE'):
+    pack_path = pack_path or pack_path_for(deck_dir)
+    sources = sorted(s for s in glob.glob(os.path.join(deck_dir, '*')) if os.path.isfile(s))
+
+    cards = dict()
+    skipped = []
+    data_size = 0
+    with open(pack_path, 'wb') as f:
+        # Placeholder header, rewritten once we know where the index ends up
+        f.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+        for source in sources:
+            try:
+                image = pygame.image.load(source)
+            except pygame.error as e:
+                print(f"Skipping {source}, could not decode it: {e}")
+                skipped.append(os.path.normpath(source))
+                continue
+
+            if scale_mode == 'SMOOTH' and image.get_bitsize() not in (24, 32):
+                image = image.convert(24)
+            entry = {'mtime': os.stat(source).st_mtime, 'sizes': dict()}
+            for size in sizes:
+                pixels = pygame.image.tostring(SCALE_MODES[scale_mode](image, size), PIXEL_FORMAT)
+                # Offsets are relative to the start of the pixel data
+                entry['sizes'][size_key(size)] = {'offset': data_size, 'width': size[0], 'height': size[1]}
+                f.write(pixels)
+                data_size += len(pixels)
+            cards[os.path.normpath(source)] = entry
+
+        index = {'scale_mode': scale_mode, 'format': PIXEL_FORMAT, 'cards': cards, 'skipped': skipped}
+        index = json.dumps(index).encode('utf-8')
+        f.write(index)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, HEADER.size + data_size, len(index)))
+
+    print(f"Packed {len(cards)} cards from {deck_dir} into {pack_path} ({data_size / 2 ** 20:.1f} MB)")
+    return pack_path
+
+
+class CardPack:
+    """Read only view of a card pack, pixels are served straight from the mmap."""
+
+    def __init__(self, pack_path):
+        self.pack_path = pack_path
+        self.mtime = os.stat(pack_path).st_mtime
+        with open(pack_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, index_offset, index_len = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{pack_path} is not a version {VERSION} card pack")
+
+        index = json.loads(self._mmap[index_offset:index_offset + index_len].decode('utf-8'))
+        self.scale_mode = index['scale_mode']
+        self.cards = index['cards']
+        self.skipped = set(index['skipped'])
+        self._data_start = HEADER.size
+        self._view = memoryview(self._mmap)
+
+    def has(self, source, size):
+        card = self.cards.get(os.path.normpath(source))
+        return card is not None and size_key(size) in card['sizes']
+
+    def surface(self, source, size):
+        # The Surface borrows the mapped pixels, nothing is decoded or copied here
+        entry = self.cards[os.path.normpath(source)]['sizes'][size_key(size)]
+        width, height = entry['width'], entry['height']
+        start = self._data_start + entry['offset']
+        pixels = self._view[start:start + width * height * len(PIXEL_FORMAT)]
+        return pygame.image.frombuffer(pixels, (width, height), PIXEL_FORMAT)
+
+    def is_fresh(self, sources):
+        # Stale as soon as a card was added, removed or touched after the pack was built
+        sources = {os.path.normpath(s) for s in sources}
+        if sources != set(self.cards) | self.skipped:
+            return False
+        return all(os.stat(s).st_mtime <= self.mtime for s in sources)
+
+    def close(self):
+        # Only safe once no Surface borrows the mapped pixels anymore
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+        self._mmap.close()
+
+
+def open_card_packs(flashcard_dir, sources, scale_mode='SCALE'):
+    """Map each source to the fresh pack that holds it, stale packs are ignored."""
+    decks = dict()
+    for source in sources:
+        decks.setdefault(os.path.dirname(os.path.normpath(source)), []).append(source)
+
+    packs = dict()
+    for pack_path in glob.glob(os.path.join(flashcard_dir, '*' + PACK_SUFFIX)):
+        deck_dir = pack_path[:-len(PACK_SUFFIX)]
+        deck_sources = decks.get(os.path.normpath(deck_dir), [])
+        try:
+            pack = CardPack(pack_path)
+        except (OSError, ValueError) as e:
+            print(f"Could not open card pack: {pack_path}, error: {e}")
+            continue
+
+        if pack.scale_mode != scale_mode or not pack.is_fresh(deck_sources):
+            print(f"Card pack {pack_path} is out of date, loading {deck_dir} from source")
+            pack.close()
+            continue
+
+        for source in deck_sources:
+            if os.path.normpath(source) in pack.cards:
+                packs[source] = pack
+    return packs
+
+
+def parse_size(value):
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile flashcard deck folders into card packs")
+    parser.add_argument('decks', nargs='+', help="deck folders, e.g. static/flashcards/animals")
+    parser.add_argument('--size', type=parse_size, action='append', dest='sizes',
+                        help="target resolution as WIDTHxHEIGHT, can be repeated (default 800x600)")
+    parser.add_argument('--scale-mode', choices=sorted(SCALE_MODES), default='SCALE')
+    args = parser.parse_args()
+
+    pygame.init()
+    for deck_dir in args.decks:
+        build_pack(deck_dir, args.sizes or [(800, 600)], scale_mode=args.scale_mode)
+
+
+if __name__ == '__main__':
+    main()
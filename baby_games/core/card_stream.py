@@ -0,0 +1,143 @@
+import threading
+import queue
+from collections import OrderedDict
+
+import pygame
+
+from .surface_cache import surface_bytes
+
+
+class CardStream:
+    """Decodes flashcards lazily and keeps them resident within a byte budget.
+
+    Upcoming cards are handed to `prefetch` and decoded on a background thread while
+    the current card is on screen. Decoding (the slow part) happens off the main
+    thread, converting to the display format happens on the main thread in `get`.
+    Every card is accounted by the real size of its pixels, so one huge scan costs
+    what it weighs instead of counting the same as a tiny icon.
+    """
+
+    def __init__(self, budget_bytes, loader=None):
+        self.budget_bytes = budget_bytes
+        self.resident_bytes = 0
+        self._loader = loader or pygame.image.load
+
+        self._resident = OrderedDict()  # path -> display converted Surface, coldest first
+        self._decoded = dict()  # path -> raw Surface handed over by the worker
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="card-prefetch", daemon=True)
+        self._worker.start()
+
+    def get(self, path):
+        if path in self._resident:
+            self._resident.move_to_end(path)
+            return self._resident[path]
+
+        with self._ready:
+            # Don't decode twice if the worker is already on it, just wait for it
+            while path in self._pending:
+                self._ready.wait()
+            raw = self._decoded.pop(path, None)
+            if raw is not None:
+                self.resident_bytes -= surface_bytes(raw)
+
+        if raw is None:
+            raw = self._loader(path)
+
+        card = raw.convert()
+        with self._lock:
+            self._resident[path] = card
+            self.resident_bytes += surface_bytes(card)
+            self._evict()
+        return card
+
+    def prefetch(self, paths):
+        """Queues the upcoming cards for decoding, paths is the whole upcoming list.
+
+        Decoded cards that are no longer upcoming (the queue was dropped, the mode
+        changed) are let go, nothing would ever pick them up.
+        """
+        paths = list(paths)
+        with self._lock:
+            wanted = set(paths)
+            for path in [p for p in self._decoded if p not in wanted]:
+                self.resident_bytes -= surface_bytes(self._decoded.pop(path))
+
+            for path in paths:
+                if path in self._resident or path in self._decoded or path in self._pending:
+                    continue
+                # Make room by dropping the coldest cards, the current one always stays
+                reserve = (len(self._pending) + 1) * self._average_card_bytes()
+                self._evict(reserve)
+                if self.resident_bytes + reserve > self.budget_bytes:
+                    break
+                self._pending.add(path)
+                self._queue.put(path)
+
+    def discard(self, path):
+        # For cards somebody else keeps a copy of from now on, e.g. scaled in a cache
+        with self._lock:
+            card = self._resident.pop(path, None)
+            if card is None:
+                card = self._decoded.pop(path, None)
+            if card is not None:
+                self.resident_bytes -= surface_bytes(card)
+
+    def resize_budget(self, budget_bytes):
+        with self._lock:
+            self.budget_bytes = budget_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._resident.clear()
+            self._decoded.clear()
+            self.resident_bytes = 0
+
+    def close(self):
+        self._queue.put(None)
+
+    def stats(self):
+        return {
+            'cards': len(self),
+            'resident_bytes': self.resident_bytes,
+            'budget_bytes': self.budget_bytes,
+        }
+
+    def __len__(self):
+        return len(self._resident) + len(self._decoded)
+
+    def _average_card_bytes(self):
+        if not len(self):
+            return 0
+        return self.resident_bytes // len(self)
+
+    def _evict(self, reserve=0):
+        # Callers hold the lock. Coldest cards are the ones we walked away from.
+        while len(self._resident) > 1 and self.resident_bytes + reserve > self.budget_bytes:
+            _, card = self._resident.popitem(last=False)
+            self.resident_bytes -= surface_bytes(card)
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            if path is None:
+                return
+            raw = None
+            try:
+                raw = self._loader(path)
+            except Exception as e:
+                # get() decodes it again on the main thread and reports the real error there
+                print(f"Could not prefetch card: {path}, error: {e}")
+            finally:
+                # Whatever happened, nobody may be left waiting on this path
+                with self._ready:
+                    self._pending.discard(path)
+                    if raw is not None:
+                        self._decoded[path] = raw
+                        self.resident_bytes += surface_bytes(raw)
+                    self._ready.notify_all()
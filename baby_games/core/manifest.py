@@ -0,0 +1,121 @@
+import json
+import os
+from dataclasses import dataclass, asdict
+
+import pygame
+from PIL import Image
+
+
+MANIFEST_NAME = '.manifest.json'
+MANIFEST_VERSION = 2
+# Pillow reads far more formats than the game can show, the cards are decoded by
+# pygame (SDL_image), so only the formats it loads count as decodable. Plain SDL
+# without SDL_image only loads BMP.
+PYGAME_FORMATS = ({'BMP', 'GIF', 'JPEG', 'MPO', 'PCX', 'PNG', 'PPM', 'TGA', 'TIFF', 'WEBP', 'XPM'}
+                  if pygame.image.get_extended() else {'BMP'})
+
+
+@dataclass
+class ManifestEntry:
+    path: str
+    mtime: float
+    size: int  # bytes on disk
+    width: int
+    height: int
+    deck: str
+    decodable: bool
+
+
+def probe_image(path):
+    """Reads just enough of the file to tell its pixel dimensions and if pygame will decode it."""
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+            image.verify()
+            decodable = image.format in PYGAME_FORMATS
+        return width, height, decodable
+    except Exception:
+        # PIL raises a zoo of exceptions on junk files, all we care about is that it failed
+        return 0, 0, False
+
+
+class CardManifest:
+    """On disk index of every flashcard under a folder of decks.
+
+    Cards live at `<root>/<deck>/<card>`. A rescan only re-probes files whose mtime or
+    size changed since the last one, and the deck builder can filter and sample
+    straight from the manifest without touching the (possibly slow) file system.
+    """
+
+    def __init__(self, root, entries=None):
+        self.root = root
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        self.entries = entries or dict()  # path -> ManifestEntry
+
+    @classmethod
+    def load(cls, root):
+        manifest_path = os.path.join(root, MANIFEST_NAME)
+        try:
+            with open(manifest_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(root)
+
+        if data.get('version') != MANIFEST_VERSION:
+            return cls(root)
+        entries = {e['path']: ManifestEntry(**e) for e in data['entries']}
+        return cls(root, entries)
+
+    def save(self):
+        data = {'version': MANIFEST_VERSION, 'entries': [asdict(e) for e in self.entries.values()]}
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def rescan(self):
+        """Syncs the manifest with the file system, returns how many files were probed."""
+        entries = dict()
+        probed = 0
+        for deck in self._scandir(self.root):
+            if not deck.is_dir():
+                continue
+            for card in self._scandir(deck.path):
+                if not card.is_file():
+                    continue
+                stat = card.stat()
+                entry = self.entries.get(card.path)
+                if entry is None or entry.mtime != stat.st_mtime or entry.size != stat.st_size:
+                    width, height, decodable = probe_image(card.path)
+                    entry = ManifestEntry(card.path, stat.st_mtime, stat.st_size, width, height,
+                                          deck.name, decodable)
+                    probed += 1
+                entries[card.path] = entry
+
+        self.entries = entries
+        return probed
+
+    def sources(self, decks=None, decodable=True):
+        # decodable=None lists every file, images or not
+        return [e.path for e in self.entries.values()
+                if (decodable is None or e.decodable == decodable) and (decks is None or e.deck in decks)]
+
+    def mark_undecodable(self, path):
+        # For files that passed the probe but pygame still refused to load
+        entry = self.entries.get(path)
+        if entry is not None:
+            entry.decodable = False
+
+    def decks(self):
+        return sorted({e.deck for e in self.entries.values()})
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _scandir(path):
+        try:
+            with os.scandir(path) as it:
+                return sorted(it, key=lambda e: e.name)
+        except OSError:
+            return []
@@ -0,0 +1,124 @@
+"""Render PDF flashcard decks into `static/flashcards/<deck>/` in parallel.
+
+Every PDF becomes a deck named after the file. Pages are split into small ranges and
+rendered across a process pool with pdf2image (which needs poppler installed). A
+content hash of each PDF is cached next to the decks, so re-runs skip PDFs that
+haven't changed.
+
+    python -m baby_games.core.pdf_ingest path/to/pdfs --dpi 100 --workers 8
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+
+CACHE_NAME = '.ingest_cache.json'
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def card_path(deck_dir, deck, page, fmt):
+    return os.path.join(deck_dir, f"{deck}-{page:04d}.{fmt}")
+
+
+def render_pages(pdf_path, first_page, last_page, deck_dir, dpi, fmt):
+    """Worker: renders one page range of a PDF, returns the number of cards written."""
+    deck = os.path.splitext(os.path.basename(pdf_path))[0]
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=first_page, last_page=last_page)
+    for page, image in enumerate(images, start=first_page):
+        image.save(card_path(deck_dir, deck, page, fmt))
+    return len(images)
+
+
+def load_cache(out_root):
+    try:
+        with open(os.path.join(out_root, CACHE_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return dict()
+
+
+def save_cache(out_root, cache):
+    with open(os.path.join(out_root, CACHE_NAME), 'w') as f:
+        json.dump(cache, f, indent=2)
+
+
+def ingest(pdf_dir, out_root='static/flashcards', dpi=100, fmt='png', pages_per_task=1, workers=None):
+    cache = load_cache(out_root)
+    jobs = []  # (pdf_path, digest, pages)
+    for pdf_path in sorted(glob.glob(os.path.join(pdf_dir, '*.pdf'))):
+        digest = file_hash(pdf_path)
+        if cache.get(pdf_path, {}).get('sha256') == digest:
+            print(f"Skipping {pdf_path}, unchanged since the last ingest")
+            continue
+        pages = pdfinfo_from_path(pdf_path)['Pages']
+        jobs.append((pdf_path, digest, pages))
+
+    if not jobs:
+        print("Nothing to ingest")
+        return 0
+
+    start = time.perf_counter()
+    rendered = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = dict()
+        for pdf_path, digest, pages in jobs:
+            deck_dir = os.path.join(out_root, os.path.splitext(os.path.basename(pdf_path))[0])
+            os.makedirs(deck_dir, exist_ok=True)
+            for first_page in range(1, pages + 1, pages_per_task):
+                last_page = min(first_page + pages_per_task - 1, pages)
+                future = pool.submit(render_pages, pdf_path, first_page, last_page, deck_dir, dpi, fmt)
+                futures[future] = pdf_path
+
+        failed = set()
+        for future in as_completed(futures):
+            try:
+                rendered += future.result()
+            except Exception as e:
+                # A broken page shouldn't sink the whole batch, the PDF is retried next run
+                print(f"Could not render {futures[future]}: {e}")
+                failed.add(futures[future])
+
+            elapsed = time.perf_counter() - start
+            print(f"\r{rendered} pages, {rendered / elapsed:.1f} pages/s", end='', flush=True)
+        print()
+
+    for pdf_path, digest, pages in jobs:
+        if pdf_path not in failed:
+            cache[pdf_path] = {'sha256': digest, 'pages': pages}
+    save_cache(out_root, cache)
+
+    elapsed = time.perf_counter() - start
+    print(f"Ingested {rendered} pages from {len(jobs)} PDFs in {elapsed:.1f}s "
+          f"({rendered / elapsed:.1f} pages/s)")
+    return rendered
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render PDF flashcard decks into static/flashcards")
+    parser.add_argument('pdf_dir', help="directory holding the PDF decks")
+    parser.add_argument('--out', default='static/flashcards', help="root folder for the decks")
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--format', default='png', choices=['png', 'jpeg'])
+    parser.add_argument('--pages-per-task', type=int, default=1,
+                        help="pages each worker renders at a time")
+    parser.add_argument('--workers', type=int, default=None, help="defaults to the number of CPUs")
+    args = parser.parse_args()
+
+    ingest(args.pdf_dir, args.out, args.dpi, args.format, args.pages_per_task, args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import random
+
+
+class DeckSampler:
+    """Deals a deck in random order without repeats, remembered across sessions.
+
+    The deck is shuffled once into a permutation of source indices and a cursor walks
+    it, so dealing a batch is a slice. When the cursor runs off the end the same list
+    is shuffled again in place. The permutation and cursor live in a small state file
+    that is reused as long as the deck hasn't changed.
+
+    Only cards reported through `shown` move the saved cursor. A shown card is swapped
+    to the cursor, so the cards of a batch that were dealt but never shown stay ahead
+    of it and are dealt again after a restart.
+    """
+
+    def __init__(self, sources, state_path=None, rng=None):
+        self.sources = sorted(sources)
+        self.state_path = state_path
+        self._rng = rng or random.Random()
+        self._fingerprint = hashlib.sha1('\n'.join(self.sources).encode('utf-8')).hexdigest()
+        self._indices = {source: i for i, source in enumerate(self.sources)}
+
+        self.order = None
+        self.cursor = 0  # cards before it have been shown
+        if state_path:
+            self._load()
+        if self.order is None:
+            self.reshuffle()
+        self._dealt = self.cursor  # cards before it have been dealt
+        self._positions = dict()  # source index -> position in order, dealt but not shown yet
+
+    def draw(self, count):
+        # Never wraps around in the middle of a batch, so a batch holds no repeats
+        if self._dealt >= len(self.order):
+            print("Dealt the whole deck, reshuffling...")
+            self.reshuffle()
+        batch = self.order[self._dealt:self._dealt + count]
+        for position, i in enumerate(batch, self._dealt):
+            self._positions[i] = position
+        self._dealt += len(batch)
+        return [self.sources[i] for i in batch]
+
+    def shown(self, source):
+        """Counts a dealt card as seen, the saved cursor moves past it."""
+        i = self._indices.get(source)
+        position = self._positions.pop(i, None)
+        if position is None:
+            return  # not dealt, or already counted
+        # Swap it to the cursor, the card that was there is still waiting to be shown
+        waiting = self.order[self.cursor]
+        self.order[self.cursor], self.order[position] = i, waiting
+        if waiting != i:
+            self._positions[waiting] = position
+        self.cursor += 1
+        if self.state_path:
+            self.save()
+
+    def reshuffle(self):
+        if self.order is None or len(self.order) != len(self.sources):
+            self.order = list(range(len(self.sources)))
+        # random.shuffle is an in place Fisher-Yates shuffle
+        self._rng.shuffle(self.order)
+        self.cursor = self._dealt = 0
+        self._positions = dict()
+
+    def remaining(self):
+        return len(self.order) - self._dealt
+
+    def save(self):
+        state = {'fingerprint': self._fingerprint, 'order': self.order, 'cursor': self.cursor}
+        tmp_path = self.state_path + '.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            # Losing the state only means repeats after a restart, not worth crashing over
+            print(f"Could not save deck state: {self.state_path}, error: {e}")
+
+    def _load(self):
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        # A different deck means the saved permutation points at the wrong cards
+        if state.get('fingerprint') != self._fingerprint or len(state['order']) != len(self.sources):
+            return
+        self.order = state['order']
+        self.cursor = state['cursor']
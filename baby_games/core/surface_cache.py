@@ -0,0 +1,109 @@
+from collections import OrderedDict
+
+import pygame
+
+
+SCALE_MODES = {
+    'SCALE': pygame.transform.scale,
+    'SMOOTH': pygame.transform.smoothscale,
+}
+
+
+def surface_bytes(surface):
+    # Real memory held by the pixel data, pitch includes any row padding
+    return surface.get_pitch() * surface.get_height()
+
+
+class SurfaceCache:
+    """Least recently used Surface cache bounded by a byte budget."""
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def get(self, key):
+        surface = self._surfaces.get(key)
+        if surface is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._surfaces.move_to_end(key)
+        return surface
+
+    def put(self, key, surface):
+        self.discard(key)
+        self._surfaces[key] = surface
+        self.resident_bytes += surface_bytes(surface)
+        self._evict()
+
+    def resize_budget(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._evict()
+
+    def discard(self, key):
+        surface = self._surfaces.pop(key, None)
+        if surface is not None:
+            self.resident_bytes -= surface_bytes(surface)
+
+    def clear(self):
+        self._surfaces.clear()
+        self.resident_bytes = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'surfaces': len(self._surfaces),
+            'resident_bytes': self.resident_bytes,
+        }
+
+    def __contains__(self, key):
+        return key in self._surfaces
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def _evict(self):
+        # Always keep the newest surface, even if it alone blows the budget
+        while self.resident_bytes > self.budget_bytes and len(self._surfaces) > 1:
+            _, evicted = self._surfaces.popitem(last=False)
+            self.resident_bytes -= surface_bytes(evicted)
+
+
+class ScaledCardCache(SurfaceCache):
+    """Display ready flashcards keyed by (source path, target size, scale mode).
+
+    Cards are scaled once and converted to the screen's pixel format so showing a
+    cached card is a single blit. Everything is dropped when the target size changes.
+    """
+
+    def __init__(self, budget_bytes, size, scale_mode='SCALE'):
+        super().__init__(budget_bytes)
+        self.size = tuple(size)
+        self.scale_mode = scale_mode
+
+    def resize(self, size):
+        size = tuple(size)
+        if size != self.size:
+            self.clear()
+            self.size = size
+
+    def key(self, source):
+        return source, self.size, self.scale_mode
+
+    def get_card(self, source, load):
+        key = self.key(source)
+        card = self.get(key)
+        if card is None:
+            card = load(source)
+            if card.get_size() != self.size:
+                if self.scale_mode == 'SMOOTH' and card.get_bitsize() not in (24, 32):
+                    # smoothscale only handles 24 and 32 bit surfaces
+                    card = card.convert()
+                card = SCALE_MODES[self.scale_mode](card, self.size)
+            card = card.convert()
+            self.put(key, card)
+        return card
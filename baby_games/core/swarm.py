@@ -0,0 +1,176 @@
+"""Moves a whole swarm of bouncing blocks with a few NumPy operations per frame.
+
+Positions, velocities, sizes and bounds of every block live in parallel arrays, one
+entry per block, instead of on the sprites. A frame moves and bounces all of them at
+once, the sprites' rects are only written back for collisions and drawing.
+
+    python -m baby_games.core.swarm  # benchmark against Block.update
+"""
+import random
+import time
+
+import numpy as np
+import pygame
+
+
+class BlockSwarm:
+    """Struct of arrays for Block sprites, same movement as Block.update but vectorized."""
+
+    def __init__(self, capacity=64):
+        self.sprites = []
+        self._index = dict()  # sprite -> row
+        self._x = np.zeros(capacity, dtype=np.int32)
+        self._y = np.zeros(capacity, dtype=np.int32)
+        self._old_x = np.zeros(capacity, dtype=np.int32)  # positions before the last step
+        self._old_y = np.zeros(capacity, dtype=np.int32)
+        self._change_x = np.zeros(capacity, dtype=np.int32)
+        self._change_y = np.zeros(capacity, dtype=np.int32)
+        self._width = np.zeros(capacity, dtype=np.int32)
+        self._height = np.zeros(capacity, dtype=np.int32)
+        self._left = np.zeros(capacity, dtype=np.int32)
+        self._top = np.zeros(capacity, dtype=np.int32)
+        self._right = np.zeros(capacity, dtype=np.int32)
+        self._bottom = np.zeros(capacity, dtype=np.int32)
+
+    def _columns(self):
+        return ('_x', '_y', '_old_x', '_old_y', '_change_x', '_change_y', '_width', '_height',
+                '_left', '_top', '_right', '_bottom')
+
+    def add(self, block):
+        """Takes over the movement of a Block, its own update() must not be called anymore."""
+        row = len(self.sprites)
+        if row == len(self._x):
+            # Grow by doubling so adding blocks one at a time stays cheap
+            capacity = max(1, 2 * row)
+            for name in self._columns():
+                column = getattr(self, name)
+                grown = np.zeros(capacity, dtype=column.dtype)
+                grown[:row] = column
+                setattr(self, name, grown)
+        self.sprites.append(block)
+        self._index[block] = row
+        rect = block.rect
+        self._x[row], self._y[row] = rect.x, rect.y
+        self._old_x[row], self._old_y[row] = rect.x, rect.y
+        self._width[row], self._height[row] = rect.width, rect.height
+        self._change_x[row], self._change_y[row] = block.change_x, block.change_y
+        self._left[row], self._top[row] = block.left_boundary, block.top_boundary
+        self._right[row], self._bottom[row] = block.right_boundary, block.bottom_boundary
+
+    def remove(self, block):
+        # Swap the last block into the hole, rows stay packed
+        row = self._index.pop(block, None)
+        if row is None:
+            return
+        last = len(self.sprites) - 1
+        if row != last:
+            moved = self.sprites[last]
+            self.sprites[row] = moved
+            self._index[moved] = row
+            for name in self._columns():
+                column = getattr(self, name)
+                column[row] = column[last]
+        self.sprites.pop()
+
+    def step(self):
+        """Moves every block one frame and bounces the ones touching their bounds."""
+        n = len(self.sprites)
+        x, y = self._x[:n], self._y[:n]
+        change_x, change_y = self._change_x[:n], self._change_y[:n]
+        self._old_x[:n] = x
+        self._old_y[:n] = y
+        x += change_x
+        y += change_y
+
+        bounce_x = (x + self._width[:n] >= self._right[:n]) | (x <= self._left[:n])
+        bounce_y = (y + self._height[:n] >= self._bottom[:n]) | (y <= self._top[:n])
+        change_x[bounce_x] *= -1
+        change_y[bounce_y] *= -1
+
+    def sync(self):
+        """Writes the positions back to the sprites' rects."""
+        n = len(self.sprites)
+        for block, x, y in zip(self.sprites, self._x[:n].tolist(), self._y[:n].tolist()):
+            block.rect.topleft = (x, y)
+
+    def crossed_cells(self, cell_size):
+        """Blocks that moved into other grid cells during the last step.
+
+        Re-bucketing just these in a SpatialHash keeps it current without looking at
+        every sprite.
+        """
+        n = len(self.sprites)
+        x, y, old_x, old_y = self._x[:n], self._y[:n], self._old_x[:n], self._old_y[:n]
+        width, height = self._width[:n] - 1, self._height[:n] - 1
+        crossed = ((x // cell_size != old_x // cell_size) |
+                   (y // cell_size != old_y // cell_size) |
+                   ((x + width) // cell_size != (old_x + width) // cell_size) |
+                   ((y + height) // cell_size != (old_y + height) // cell_size))
+        return [self.sprites[i] for i in np.flatnonzero(crossed).tolist()]
+
+    def draw(self, surface):
+        """Blits every block straight from the arrays, rects don't need to be current."""
+        n = len(self.sprites)
+        surface.blits(zip([block.image for block in self.sprites],
+                          zip(self._x[:n].tolist(), self._y[:n].tolist())), doreturn=False)
+
+    def __contains__(self, block):
+        return block in self._index
+
+    def __len__(self):
+        return len(self.sprites)
+
+
+def benchmark(counts=(50, 1000, 10000, 50000), frames=120):
+    """Times moving and drawing bouncing blocks, one update() per sprite against the swarm."""
+    from .utils import Block, SCREEN_WIDTH, SCREEN_HEIGHT, RED
+
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    rng = random.Random(0)
+    for count in counts:
+        blocks = []
+        for _ in range(count):
+            block = Block(RED)
+            block.rect.topleft = (rng.randrange(1, SCREEN_WIDTH - 30), rng.randrange(1, SCREEN_HEIGHT - 30))
+            block.change_x = rng.randrange(-3, 4)
+            block.change_y = rng.randrange(-3, 4)
+            block.right_boundary = SCREEN_WIDTH
+            block.bottom_boundary = SCREEN_HEIGHT
+            blocks.append(block)
+        group = pygame.sprite.Group(blocks)
+        swarm = BlockSwarm(count)
+        for block in blocks:
+            swarm.add(block)
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            group.update()
+        sprite_ms = (time.perf_counter() - start) * 1000 / frames
+        start = time.perf_counter()
+        for _ in range(frames):
+            group.draw(surface)
+        group_draw_ms = (time.perf_counter() - start) * 1000 / frames
+
+        # Both moved the same blocks the same way, the swarm starts where update() left them
+        swarm = BlockSwarm(count)
+        for block in blocks:
+            swarm.add(block)
+        start = time.perf_counter()
+        for _ in range(frames):
+            swarm.step()
+        step_ms = (time.perf_counter() - start) * 1000 / frames
+        start = time.perf_counter()
+        for _ in range(frames):
+            swarm.sync()
+        sync_ms = (time.perf_counter() - start) * 1000 / frames
+        start = time.perf_counter()
+        for _ in range(frames):
+            swarm.draw(surface)
+        draw_ms = (time.perf_counter() - start) * 1000 / frames
+
+        print(f"{count:6d} blocks: update() {sprite_ms:6.2f} ms + Group.draw {group_draw_ms:6.2f} ms, "
+              f"swarm step {step_ms:5.2f} ms + draw {draw_ms:6.2f} ms (rect sync {sync_ms:5.2f} ms)")
+
+
+if __name__ == '__main__':
+    benchmark()
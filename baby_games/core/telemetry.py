@@ -0,0 +1,199 @@
+"""Columnar event telemetry: an in-memory ring buffer flushed to .npy chunks in the background.
+
+Recording a row only writes into a preallocated NumPy structured array, the file
+system is touched by a flusher thread that writes every batch as a new numbered
+chunk in the telemetry folder. Chunks are never rewritten, later sessions keep
+appending new ones and the folder is read back by concatenating them.
+
+    python -m baby_games.core.telemetry telemetry/type_fighter
+"""
+import argparse
+import glob
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+
+# Rows recorded by quick time events
+QTE_PROMPT, QTE_KEY, QTE_SUCCESS, QTE_TIMEOUT = range(4)
+QTE_KINDS = ('prompt', 'key', 'success', 'timeout')
+
+
+def qte_dtype(key_width=16):
+    """Row layout for quick time events, key_width must fit the longest key or word asked for.
+
+    NumPy silently truncates longer strings, so games size it from their level and word list.
+    """
+    return np.dtype([
+        ('wall_time', 'f8'),  # seconds since the epoch
+        ('game_ms', 'f8'),  # game clock
+        ('kind', 'u1'),  # one of QTE_KINDS
+        ('event', 'i4'),  # index of the event in the level, -1 for keys matching nothing
+        ('event_type', 'U8'),
+        ('key', f'U{max(1, key_width)}'),  # key or word asked for
+        ('pressed', 'U1'),
+        ('correct', '?'),
+        ('reaction_ms', 'f4'),  # since the prompt was shown, NaN for prompts
+    ])
+
+
+QTE_DTYPE = qte_dtype()
+CHUNK_PATTERN = re.compile(r'chunk_(\d+)\.npy$')
+
+
+class Telemetry:
+    """Records fixed width rows into a ring buffer that a background thread flushes in batches.
+
+    When the flusher can't keep up, new rows are dropped and counted rather than
+    blocking the caller, which is usually in the middle of a frame.
+    """
+
+    def __init__(self, directory, dtype=QTE_DTYPE, capacity=4096, batch_size=512, flush_interval=10.0):
+        self.directory = directory
+        self.dtype = dtype
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.chunks = 0
+
+        self._buffer = np.zeros(capacity, dtype=dtype)
+        self._head = 0  # rows recorded so far
+        self._tail = 0  # rows handed to the flusher so far
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._closed = False
+
+        os.makedirs(directory, exist_ok=True)
+        # Continue numbering after the highest chunk from earlier runs, counting them would
+        # reuse a number once an older chunk has been deleted
+        indices = [int(match.group(1)) for match in map(CHUNK_PATTERN.search, os.listdir(directory)) if match]
+        self._next_chunk = max(indices, default=-1) + 1
+        self._flusher = threading.Thread(target=self._run, name="telemetry-flush", daemon=True)
+        self._flusher.start()
+
+    def record(self, row):
+        """Stores one row, a tuple in dtype field order."""
+        with self._lock:
+            if self._head - self._tail >= len(self._buffer):
+                self.dropped += 1
+                return
+            self._buffer[self._head % len(self._buffer)] = row
+            self._head += 1
+            if self._head - self._tail >= self.batch_size:
+                self._wake.notify()
+
+    def close(self):
+        """Flushes whatever is left and stops the flusher."""
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+        self._flusher.join()
+
+    def _take(self):
+        # Callers hold the lock. Copies out the pending rows, the ring may wrap around.
+        start, end = self._tail, self._head
+        indices = np.arange(start, end) % len(self._buffer)
+        rows = self._buffer[indices]
+        self._tail = end
+        return rows
+
+    def _run(self):
+        while True:
+            with self._wake:
+                if not self._closed and self._head - self._tail < self.batch_size:
+                    self._wake.wait(self.flush_interval)
+                rows = self._take()
+                closed = self._closed
+            if len(rows):
+                self._write(rows)
+            if closed:
+                return
+
+    def _write(self, rows):
+        path = os.path.join(self.directory, f"chunk_{self._next_chunk:06d}.npy")
+        tmp_path = path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.save(f, rows)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write telemetry: {path}, error: {e}")
+            return
+        self._next_chunk += 1
+        self.chunks += 1
+
+
+def load_records(directory, dtype=QTE_DTYPE):
+    """Every row recorded in a telemetry folder, in recording order.
+
+    Chunks written with different string widths are widened to the largest one.
+    """
+    paths = sorted(glob.glob(os.path.join(directory, 'chunk_*.npy')),
+                   key=lambda path: int(CHUNK_PATTERN.search(path).group(1)))
+    chunks = [np.load(path) for path in paths]
+    if not chunks:
+        return np.zeros(0, dtype=dtype)
+    return np.concatenate(chunks)
+
+
+def percentiles_by(records, field, value='reaction_ms', percentiles=(50, 90, 99)):
+    """Percentiles of one column grouped by another, without a loop over the groups.
+
+    Returns (groups, table) where table[i, j] is percentile j of group i, linearly
+    interpolated like np.percentile. Rows with a NaN value are left out.
+    """
+    records = records[~np.isnan(records[value])]
+    if not len(records):
+        return np.zeros(0, dtype=records.dtype[field]), np.zeros((0, len(percentiles)))
+
+    groups, inverse = np.unique(records[field], return_inverse=True)
+    # Sort by group, then by value, so every group is a sorted run
+    order = np.lexsort((records[value], inverse))
+    values = records[value][order].astype('f8')
+    counts = np.bincount(inverse, minlength=len(groups))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    # Fractional rank of every percentile within every group, shape (groups, percentiles)
+    ranks = (counts[:, None] - 1) * (np.asarray(percentiles, dtype='f8')[None, :] / 100)
+    lower = np.floor(ranks).astype(int)
+    upper = np.minimum(lower + 1, counts[:, None] - 1)
+    weight = ranks - lower
+    table = (values[starts[:, None] + lower] * (1 - weight) +
+             values[starts[:, None] + upper] * weight)
+    return groups, table
+
+
+def summarize(records, percentiles=(50, 90, 99)):
+    successes = records[records['kind'] == QTE_SUCCESS]
+    columns = ''.join(f"p{p}".rjust(9) for p in percentiles)
+    for field in ('key', 'event_type'):
+        groups, table = percentiles_by(successes, field, percentiles=percentiles)
+        print(f"Reaction time (ms) by {field}:".ljust(36) + columns)
+        for group, row in zip(groups, table):
+            print(f"  {group}".ljust(36) + ''.join(f"{v:9.0f}" for v in row))
+
+    prompts = np.count_nonzero(records['kind'] == QTE_PROMPT)
+    timeouts = np.count_nonzero(records['kind'] == QTE_TIMEOUT)
+    keys = records[records['kind'] == QTE_KEY]
+    accuracy = keys['correct'].mean() if len(keys) else float('nan')
+    print(f"{prompts} prompts, {len(successes)} beaten, {timeouts} timed out, "
+          f"{len(keys)} keys pressed ({accuracy:.0%} correct)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize recorded quick time event telemetry")
+    parser.add_argument('directory', help="folder holding chunk_*.npy files")
+    parser.add_argument('--percentiles', type=int, nargs='+', default=[50, 90, 99])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    records = load_records(args.directory)
+    print(f"Loaded {len(records)} rows in {(time.perf_counter() - start) * 1000:.0f} ms")
+    summarize(records, args.percentiles)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+import pygame
+
+from .surface_cache import SurfaceCache
+
+
+WHITE = (255, 255, 255)
+# Characters that make up timers, scores and counters
+NUMERIC_GLYPHS = '0123456789.:-+/% '
+
+
+class GlyphAtlas:
+    """Every numeric character of one font and color rendered once onto a single surface.
+
+    Drawing a changing number is then a handful of blits from the atlas instead of
+    rasterizing a new string every time the value ticks.
+    """
+
+    def __init__(self, font, color, antialias=True, glyphs=NUMERIC_GLYPHS):
+        rendered = [(char, font.render(char, antialias, color)) for char in glyphs]
+        self.height = max(s.get_height() for _, s in rendered)
+        self.surface = pygame.Surface((sum(s.get_width() for _, s in rendered), self.height),
+                                      pygame.SRCALPHA)
+        self.rects = dict()
+        x = 0
+        for char, glyph in rendered:
+            self.surface.blit(glyph, (x, 0))
+            self.rects[char] = pygame.Rect(x, 0, glyph.get_width(), self.height)
+            x += glyph.get_width()
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+
+    def covers(self, text):
+        return all(char in self.rects for char in text)
+
+    def width(self, text):
+        return sum(self.rects[char].width for char in text)
+
+    def draw(self, dest, text, topleft):
+        x, y = topleft
+        for char in text:
+            area = self.rects[char]
+            dest.blit(self.surface, (x, y), area)
+            x += area.width
+        return pygame.Rect(topleft, (x - topleft[0], self.height))
+
+
+class TextCache(SurfaceCache):
+    """Rendered text shared by all games, keyed by (font, size, text, color).
+
+    Strings like prompts and labels are rasterized once and kept in an LRU bounded by
+    bytes. Numbers are composed from a glyph atlas, so a ticking timer never goes back
+    to the font rasterizer no matter how many values it runs through.
+    """
+
+    def __init__(self, budget_bytes=4 * 1024 * 1024):
+        super().__init__(budget_bytes)
+        self._fonts = dict()  # (name, size) -> Font
+        self._atlases = dict()  # (name, size, color, antialias) -> GlyphAtlas
+
+    def font(self, size, name=None):
+        key = (name, size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._fonts[key] = pygame.font.Font(name, size)
+        return font
+
+    def render(self, text, size=36, color=WHITE, name=None, antialias=True):
+        key = (name, size, text, tuple(color), antialias)
+        surface = self.get(key)
+        if surface is None:
+            surface = self.font(size, name).render(text, antialias, color)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+            self.put(key, surface)
+        return surface
+
+    def atlas(self, size=36, color=WHITE, name=None, antialias=True):
+        key = (name, size, tuple(color), antialias)
+        atlas = self._atlases.get(key)
+        if atlas is None:
+            atlas = self._atlases[key] = GlyphAtlas(self.font(size, name), color, antialias)
+        return atlas
+
+    def draw(self, dest, text, center, size=36, color=WHITE, name=None):
+        surface = self.render(text, size, color, name)
+        rect = surface.get_rect(center=center)
+        dest.blit(surface, rect)
+        return rect
+
+    def draw_number(self, dest, value, center, label='', size=36, color=WHITE, name=None):
+        """Draws a label followed by a value, centered together.
+
+        The line is composed from the cached label and atlas glyphs instead of being
+        rasterized, and is kept in the LRU like any other text, so a timer showing the
+        same value for several frames is a single blit.
+        """
+        value = str(value)
+        atlas = self.atlas(size, color, name)
+        if not atlas.covers(value):
+            return self.draw(dest, label + value, center, size, color, name)
+
+        key = (name, size, label, value, tuple(color), 'atlas')
+        surface = self.get(key)
+        if surface is None:
+            label_surface = self.render(label, size, color, name) if label else None
+            label_width = label_surface.get_width() if label_surface else 0
+            height = max(atlas.height, label_surface.get_height() if label_surface else 0)
+            surface = pygame.Surface((label_width + atlas.width(value), height), pygame.SRCALPHA)
+            if label_surface:
+                surface.blit(label_surface, (0, 0))
+            atlas.draw(surface, value, (label_width, 0))
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+            self.put(key, surface)
+
+        rect = surface.get_rect(center=center)
+        dest.blit(surface, rect)
+        return rect
+
+    def clear(self):
+        super().clear()
+        self._atlases.clear()
+
+
+# Shared by all games
+text_cache = TextCache()
@@ -4,6 +4,8 @@ import random
 import os
 from pygame.locals import *
 
+from .assets import registry
+
 # Define some colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -131,10 +133,107 @@ class Projectile(pygame.sprite.Sprite):
             self.kill()
 
 
+PROJECTILE_SIZE = (4, 10)
+PROJECTILE_VELOCITY = 5
+
+
+class PooledProjectile:
+    """A projectile owned by a ProjectilePool, reused instead of being garbage collected."""
+    __slots__ = ('rect', 'floating_point_x', 'floating_point_y', 'change_x', 'change_y', 'alive')
+
+    def __init__(self):
+        self.rect = pygame.Rect(0, 0, PROJECTILE_SIZE[0], PROJECTILE_SIZE[1])
+        self.floating_point_x = 0.0
+        self.floating_point_y = 0.0
+        self.change_x = 0.0
+        self.change_y = 0.0
+        self.alive = False
+
+
+class ProjectilePool:
+    """Fixed number of projectiles, preallocated and recycled.
+
+    Firing takes a projectile off the free list and aims it, nothing is allocated.
+    Projectiles that left the screen or hit something are retired in one pass by
+    collect(), once a frame. All of them share a single image.
+    """
+
+    def __init__(self, capacity=256, color=BLUE):
+        self.capacity = capacity
+        self.image = pygame.Surface(PROJECTILE_SIZE)
+        self.image.fill(color)
+        self._free = [PooledProjectile() for _ in range(capacity)]
+        self.active = []
+        self.peak = 0
+        self.dropped = 0  # shots fired while every projectile was in flight
+
+    def fire(self, start_x, start_y, dest_x, dest_y):
+        if not self._free:
+            self.dropped += 1
+            return None
+        projectile = self._free.pop()
+        projectile.rect.x = start_x
+        projectile.rect.y = start_y
+        projectile.floating_point_x = start_x
+        projectile.floating_point_y = start_y
+
+        # Normalized direction times velocity, same as going through the angle but without trig
+        x_diff = dest_x - start_x
+        y_diff = dest_y - start_y
+        distance = math.hypot(x_diff, y_diff)
+        if distance:
+            projectile.change_x = x_diff / distance * PROJECTILE_VELOCITY
+            projectile.change_y = y_diff / distance * PROJECTILE_VELOCITY
+        else:
+            projectile.change_x = PROJECTILE_VELOCITY
+            projectile.change_y = 0.0
+
+        projectile.alive = True
+        self.active.append(projectile)
+        self.peak = max(self.peak, len(self.active))
+        return projectile
+
+    def update(self):
+        for projectile in self.active:
+            projectile.floating_point_x += projectile.change_x
+            projectile.floating_point_y += projectile.change_y
+            x = projectile.rect.x = int(projectile.floating_point_x)
+            y = projectile.rect.y = int(projectile.floating_point_y)
+            # If the bullet flies of the screen, it is retired by the next collect()
+            if x < 0 or x > SCREEN_WIDTH or y < 0 or y > SCREEN_HEIGHT:
+                projectile.alive = False
+
+    def retire(self, projectile):
+        projectile.alive = False
+
+    def collect(self):
+        """Returns every retired projectile to the free list, compacting active in place."""
+        active = self.active
+        kept = 0
+        for projectile in active:
+            if projectile.alive:
+                active[kept] = projectile
+                kept += 1
+            else:
+                self._free.append(projectile)
+        del active[kept:]
+
+    def draw(self, surface):
+        image = self.image
+        surface.blits([(image, projectile.rect) for projectile in self.active], doreturn=False)
+
+    @property
+    def occupancy(self):
+        """Fraction of the pool in flight."""
+        return len(self.active) / self.capacity
+
+    def __len__(self):
+        return len(self.active)
+
+
 def load_image(file_name):
-    if os.path.isfile and os.path.exists(file_name):
-        image = pygame.image.load(file_name).convert_alpha()
-        return image
+    if os.path.isfile(file_name):
+        return registry.load(file_name, alpha=True)
 
 
 
@@ -0,0 +1,95 @@
+class TrieNode:
+    __slots__ = ('children', 'targets', 'ends')
+
+    def __init__(self):
+        self.children = dict()  # char -> TrieNode
+        self.targets = set()  # every target whose word runs through this node
+        self.ends = []  # targets whose word ends here, oldest first
+
+
+class PrefixMatcher:
+    """Matches typed characters against the words of all active targets at once.
+
+    The words of the targets on screen live in a prefix trie and the matcher keeps its
+    place in it, so each keystroke is a single child lookup no matter how many targets
+    are active. Adding or removing a target costs the length of its word.
+    """
+
+    def __init__(self):
+        self.root = TrieNode()
+        self.node = self.root
+        self.typed = ''
+        self._words = dict()  # target -> word
+
+    def add(self, word, target):
+        self._words[target] = word
+        node = self.root
+        for char in word:
+            node = node.children.setdefault(char, TrieNode())
+            node.targets.add(target)
+        node.ends.append(target)
+
+    def remove(self, target):
+        word = self._words.pop(target, None)
+        if word is None:
+            return
+        path = [self.root]
+        for char in word:
+            path.append(path[-1].children[char])
+        path[-1].ends.remove(target)
+        # Walk back up, dropping the target and pruning nodes nobody uses anymore
+        for depth in range(len(word), 0, -1):
+            node = path[depth]
+            node.targets.discard(target)
+            if not node.targets:
+                del path[depth - 1].children[word[depth - 1]]
+        # Whatever was being typed may have belonged to the removed target
+        if self.node is not self.root and not self.node.targets:
+            self.reset()
+
+    def feed(self, char):
+        """Advances the typed prefix by one character, returns the target it completes if any.
+
+        A character that doesn't continue any word starts over with that character, so
+        a typo costs the word in progress, not the next one.
+        """
+        node = self.node.children.get(char)
+        if node is None:
+            self.typed = ''
+            node = self.root.children.get(char)
+            if node is None:
+                self.node = self.root
+                return None
+        self.node = node
+        self.typed += char
+
+        if node.ends:
+            target = node.ends[0]
+            self.remove(target)
+            self.reset()
+            return target
+        return None
+
+    def reset(self):
+        self.node = self.root
+        self.typed = ''
+
+    def matching(self):
+        """Targets whose word starts with what has been typed so far."""
+        return self.node.targets if self.node is not self.root else set()
+
+    def first_chars(self):
+        """First characters of the active words, to keep new words from sharing them."""
+        return self.root.children.keys()
+
+    def targets(self):
+        return self._words.keys()
+
+    def word(self, target):
+        return self._words.get(target)
+
+    def __contains__(self, target):
+        return target in self._words
+
+    def __len__(self):
+        return len(self._words)
@@ -1,14 +1,33 @@
 import sys
+import time
 import pygame
 from collections import deque
 import os
-import glob
 import random
+import re
+import string
 from static.consts import ALL_COLORS, PRIMARY_COLORS
+from baby_games.core.card_stream import CardStream
+from baby_games.core.surface_cache import ScaledCardCache
+from baby_games.core.card_pack import open_card_packs
+from baby_games.core.manifest import CardManifest
+from baby_games.core.sampler import DeckSampler
+from baby_games.core.assets import registry
 import pygameMenu
 import traceback
 
 
+def card_letter(source):
+    # Alphabet-1-Large-3.gif -> 'c', c.png -> 'c', anything else isn't an alphabet card
+    stem = os.path.splitext(os.path.basename(source))[0]
+    match = re.fullmatch(r'alphabet.*?(\d+)', stem, re.IGNORECASE)
+    if match and 1 <= int(match.group(1)) <= len(string.ascii_lowercase):
+        return string.ascii_lowercase[int(match.group(1)) - 1]
+    if len(stem) == 1 and stem.isalpha():
+        return stem.lower()
+    return None
+
+
 class FlashcardGame:
 
     def __init__(self, **kwargs):
@@ -16,12 +35,23 @@ class FlashcardGame:
         self.COLOR_WHITE = (255, 255, 255)
         self.MENU_BACKGROUND_COLOR = (228, 55, 36)
         self.FPS = 30.0
+        self.PLAY_FPS = 60
         self.MOUSE_COUNTER = 0
+        self.BRUSH_RADIUS = 60
         self.DEFAULT_MODE = 'NORMAL'
         self.DEFAULT_COLOR_SCHEMA = 'PRIMARY'
         self.DEFAULT_DARA_FACE = False
-        self.DEFAULT_SUBSAMPLE_SIZE = 5 # 100
+        self.DEFAULT_SUBSAMPLE_SIZE = 100  # only counts source paths, memory is bounded by the budget
+        self.DEFAULT_PREFETCH_SIZE = 3
+        # Bounds every card held in memory, set per machine with FLASHCARD_BUDGET_MB (see main)
+        self.DEFAULT_CARD_BUDGET_BYTES = 128 * 1024 * 1024
+        # Part of the budget for full size cards decoded ahead, the rest holds the scaled cards
+        self.DEFAULT_PREFETCH_BUDGET_SHARE = 0.25
+        self.DEFAULT_SCALE_MODE = 'SCALE'
         self.DEFAULT_RECYCLE_FLASHCARDS = False
+        self.DEFAULT_RESCAN_MANIFEST = True
+        # Minimum time between two card advances, 0 means at most one advance per frame
+        self.DEFAULT_ADVANCE_INTERVAL_MS = 0
 
         self._running = False
 
@@ -31,7 +61,13 @@ class FlashcardGame:
         self.clock = None
 
         self.current_card_idx = 0
+        self.current_letter_idx = 0
+        self.coalesced_events = 0
         self.flash_card_pile = None
+        self.card_stream = None
+        self.card_budget_bytes = self.DEFAULT_CARD_BUDGET_BYTES
+        self.card_packs = dict()
+        self.upcoming_cards = deque()
 
         self.main_menu = None
         self.play_menu = None
@@ -39,15 +75,32 @@ class FlashcardGame:
 
         self.size = self.width, self.height = (800, 600)
         #self.size = self.width, self.height = (1920, 1080)
+        self.card_cache = ScaledCardCache(self._split_budget()[1], self.size, self.DEFAULT_SCALE_MODE)
         if self._test:
             print("Using test flashcard sources")
-            self.flashcard_sources = glob.glob("static/test/alphabet/*")
+            self.flashcard_dir = "static/test"
         else:
             print("Using default flashcard sources with subsampling")
-            self.flashcard_sources = glob.glob("static/flashcards/**/*")
-
-        self.flashcard_sources = set(self.flashcard_sources)
-        self.fresh_sources = self.flashcard_sources.copy()
+            self.flashcard_dir = "static/flashcards"
+
+        self.manifest = self.init_manifest()
+        self.flashcard_sources = self.manifest.sources()
+        # Decks compiled with baby_games.core.card_pack skip image decoding entirely. Packs
+        # are checked against every file in the deck, they record the ones that aren't images.
+        self.card_packs = open_card_packs(self.flashcard_dir, self.manifest.sources(decodable=None),
+                                          self.DEFAULT_SCALE_MODE)
+        self.alphabet_index = self.init_alphabet_index()
+        self.alphabet = sorted(self.alphabet_index)
+
+        # NOREPEATS batches are dealt from one shuffled deck that survives restarts
+        self.deck_sampler = DeckSampler(self.flashcard_sources, os.path.join(self.flashcard_dir, ".deck_state.json"))
+
+        # Built once per color schema so picking a color is just a random.choice
+        self.palettes = {
+            'ALL': [pygame.Color(*c) for c in ALL_COLORS.values()],
+            'PRIMARY': [pygame.Color(*c) for c in PRIMARY_COLORS.values()],
+            'BLACK': [pygame.Color(*self.COLOR_BLACK)],
+        }
 
         self.params = dict()
         self.params['mode'] = self.DEFAULT_MODE
@@ -71,60 +124,220 @@ class FlashcardGame:
 
 
     def play_game(self):
-        card = self.flash_card_pile[self.current_card_idx]
-        card = pygame.transform.scale(card, self.size)
+        if self.params['mode'] == 'ALPHABET':
+            card = self._load_card(self.alphabet_index[self.alphabet[self.current_letter_idx]])
+        else:
+            card = self._load_card(self.flash_card_pile[self.current_card_idx])
+        # Painting goes on its own transparent layer over the card, cached cards stay untouched
+        paint_layer = pygame.Surface(self.size, pygame.SRCALPHA)
+        # Only the parts of the screen that changed get pushed to the display, a new card
+        # still flips the whole display
+        full_redraw = True
+        dirty_rects = []
+        # Mouse positions of the stroke being painted, drawn in one batch per frame
+        stroke = []
+        stroke_start = None
+        painting = False
+        local_color = self.get_color()
+        # Key mashing is collapsed into a single card advance per frame, the last key wins
+        advance_event = None
+        advance_presses = 0
+        last_advance = 0
+        frames = 0
+        idle_time = 0.0
+        start_time = time.perf_counter()
+        start_cpu = time.process_time()
 
         while 1:
-            for event in pygame.event.get():
+            if painting or advance_event is not None:
+                # Something is changing on screen, run at a capped frame rate
+                self.clock.tick(self.PLAY_FPS)
+                events = pygame.event.get()
+            else:
+                # A static card can sit there for minutes, sleep until something happens
+                idle_start = time.perf_counter()
+                events = [pygame.event.wait()] + pygame.event.get()
+                idle_time += time.perf_counter() - idle_start
+            frames += 1
+
+            for event in events:
                 if event.type == pygame.QUIT:
+                    wall_time = time.perf_counter() - start_time
+                    print("play_game: {} frames in {:.1f}s, {:.0%} idle, {:.1%} CPU".format(
+                        frames, wall_time, idle_time / wall_time, (time.process_time() - start_cpu) / wall_time))
                     sys.exit()
 
-                # ToDo implement feature where for alphabet flash cards, the correct key needs to be pressed to move on
                 if event.type == pygame.KEYDOWN:
-                    print(pygame.key.name(event.key))
-                    try:
-                        card = self.draw_card(event)
-                    except IndexError as e:
-                        traceback.print_exc()
-                    card = pygame.transform.scale(card, self.size)
-                    cardrect = card.get_rect()
+                    # For alphabet flash cards only the correct key moves on
+                    if self.params['mode'] != 'ALPHABET' or pygame.key.name(event.key) == self.alphabet[self.current_letter_idx]:
+                        advance_event = event
+                        advance_presses += 1
 
                 if event.type == pygame.MOUSEBUTTONDOWN:
 
                     print(event.button)
-                    print(type(event.button))
 
                     if self.params['dara_face'] and event.button == 1:
                         print("HERE")
-                        dara_face = pygame.image.load("static/dara_face.jpg").convert()
-                        dara_face = pygame.transform.scale(dara_face, (140, 210))
-                        card.blit(dara_face, pygame.mouse.get_pos())
+                        dara_face = registry.load("static/dara_face.jpg", size=(140, 210))
+                        dirty_rects.append(paint_layer.blit(dara_face, event.pos))
                     else:
+                        # Finish whatever was painted so far before the color can change
+                        if stroke:
+                            dirty_rects.append(self._paint_stroke(paint_layer, local_color, stroke_start, stroke))
+                            stroke.clear()
+
                         if self.MOUSE_COUNTER % 5 == 0:
-                            # This ensures local_color is always set, probably not the best...
                             local_color = self.get_color()
                             self.MOUSE_COUNTER = 0
 
                         self.MOUSE_COUNTER += 1
 
                         pygame.mouse.set_cursor(*pygame.cursors.diamond)
-                        pygame.draw.circle(card, local_color, (pygame.mouse.get_pos()), 60)
+                        painting = True
+                        stroke_start = None
+                        stroke.append(event.pos)
+
+                if event.type == pygame.MOUSEMOTION and painting:
+                    stroke.append(event.pos)
+
+                if event.type == pygame.MOUSEBUTTONUP:
+                    painting = False
+
+            now = pygame.time.get_ticks()
+            if advance_event is not None and now - last_advance >= self.DEFAULT_ADVANCE_INTERVAL_MS:
+                self.coalesced_events += advance_presses - 1
+                print("{} ({} key presses coalesced so far)".format(
+                    pygame.key.name(advance_event.key), self.coalesced_events))
+                try:
+                    card = self.draw_card(advance_event)
+                    paint_layer.fill((0, 0, 0, 0))
+                    stroke.clear()
+                    stroke_start = None
+                    full_redraw = True
+                except IndexError as e:
+                    traceback.print_exc()
+                advance_event = None
+                advance_presses = 0
+                last_advance = now
+
+            if stroke:
+                dirty_rects.append(self._paint_stroke(paint_layer, local_color, stroke_start, stroke))
+                stroke_start = stroke[-1]
+                stroke.clear()
+
+            if full_redraw:
                 self.surface.blit(card, (0, 0))
-
+                self.surface.blit(paint_layer, (0, 0))
                 pygame.display.flip()
+            elif dirty_rects:
+                for rect in dirty_rects:
+                    self.surface.blit(card, rect, rect)
+                    self.surface.blit(paint_layer, rect, rect)
+                pygame.display.update(dirty_rects)
+            full_redraw = False
+            dirty_rects.clear()
+
+    def _paint_stroke(self, layer, color, start, points):
+        # Round brush from start (already painted, None for a new stroke) through points,
+        # returns the rect that was touched
+        dirty = None
+        for end in points:
+            rect = pygame.draw.circle(layer, color, end, self.BRUSH_RADIUS)
+            if start is not None:
+                rect.union_ip(pygame.draw.line(layer, color, start, end, self.BRUSH_RADIUS * 2))
+            dirty = rect if dirty is None else dirty.union(rect)
+            start = end
+        return dirty
 
     def draw_card(self, event=None):
         print(len(self.flash_card_pile))
+        if self._test:
+            print("card cache {}".format(self.card_cache.stats()))
+            print("card pool {}".format(self.card_stream.stats()))
         mode = self.params['mode']
-        if mode == 'NOREPEATS':
+        if mode == 'ALPHABET':
+            self.current_letter_idx = (self.current_letter_idx + 1) % len(self.alphabet)
+            card = self._load_card(self.alphabet_index[self.alphabet[self.current_letter_idx]])
+        elif mode == 'NOREPEATS':
             if isinstance(event, pygame.event.EventType) and event.key == pygame.K_LEFT:
                 card = self._draw_previous_card()
             else:
                 card = self._draw_new_card()
         else:
-            card = random.choice(self.flash_card_pile)
+            if not self.upcoming_cards:
+                self.upcoming_cards.append(random.choice(self.flash_card_pile))
+            card = self._load_card(self.upcoming_cards.popleft())
+        return card
+
+    def _load_card(self, source):
+        # Returns the card scaled to the screen, only decoding it if it isn't cached
+        self.card_cache.resize(self.size)
+        while True:
+            try:
+                card = self.card_cache.get_card(source, self._decode_card)
+                break
+            except pygame.error as e:
+                print("Could not load card: {}, error: {}".format(source, e))
+                source = self._skip_card(source)
+        # Only cards that made it to the screen leave the rotation for the next launch
+        self.deck_sampler.shown(source)
+        # The cache holds the scaled copy now, the full size one would only be dead weight
+        self.card_stream.discard(source)
+        upcoming = [s for s in self._upcoming_sources()
+                    if self.card_cache.key(s) not in self.card_cache and not self._is_packed(s)]
+        self.card_stream.prefetch(upcoming)
         return card
 
+    def _skip_card(self, source):
+        # Drops a card pygame can't load from every pile it is in and returns the card
+        # to show in its place. The manifest remembers it, so it isn't dealt again.
+        self.manifest.mark_undecodable(source)
+        self.manifest.save()
+        self.card_stream.discard(source)
+        self.flashcard_sources = [s for s in self.flashcard_sources if s != source]
+
+        mode = self.params['mode']
+        if mode == 'ALPHABET':
+            self.alphabet_index = self.init_alphabet_index()
+            self.alphabet = sorted(self.alphabet_index)
+            self.current_letter_idx %= len(self.alphabet)
+            return self.alphabet_index[self.alphabet[self.current_letter_idx]]
+
+        self.flash_card_pile = [s for s in self.flash_card_pile if s != source]
+        if mode == 'NOREPEATS':
+            if self.current_card_idx >= len(self.flash_card_pile):
+                # It was the last card of the batch, deal the next one
+                self.init_flashcards()
+            return self.flash_card_pile[self.current_card_idx]
+
+        self.upcoming_cards = deque(s for s in self.upcoming_cards if s != source)
+        if self.upcoming_cards:
+            return self.upcoming_cards.popleft()
+        return random.choice(self.flash_card_pile)
+
+    def _is_packed(self, source):
+        return source in self.card_packs and self.card_packs[source].has(source, self.size)
+
+    def _decode_card(self, source):
+        if self._is_packed(source):
+            return self.card_packs[source].surface(source, self.size)
+        return self.card_stream.get(source)
+
+    def _upcoming_sources(self):
+        # The cards most likely to be shown next, these get decoded in the background
+        if self.params['mode'] == 'ALPHABET':
+            return [self.alphabet_index[self.alphabet[(self.current_letter_idx + i) % len(self.alphabet)]]
+                    for i in range(1, self.DEFAULT_PREFETCH_SIZE + 1)]
+
+        if self.params['mode'] == 'NOREPEATS':
+            start = self.current_card_idx + 1
+            return self.flash_card_pile[start:start + self.DEFAULT_PREFETCH_SIZE]
+
+        while len(self.upcoming_cards) < self.DEFAULT_PREFETCH_SIZE:
+            self.upcoming_cards.append(random.choice(self.flash_card_pile))
+        return list(self.upcoming_cards)
+
     def _draw_new_card(self):
         self.current_card_idx += 1
         if self.current_card_idx >= len(self.flash_card_pile):
@@ -137,57 +350,97 @@ class FlashcardGame:
             self.current_card_idx = 0
 
         print("draw_card {}".format(self.current_card_idx))
-        card = self.flash_card_pile[self.current_card_idx]
+        card = self._load_card(self.flash_card_pile[self.current_card_idx])
         return card
 
     def _draw_previous_card(self):
         if self.current_card_idx > 0:
             self.current_card_idx -= 1
-        card = self.flash_card_pile[self.current_card_idx]
+        card = self._load_card(self.flash_card_pile[self.current_card_idx])
         return card
 
     def get_color(self, color_tuple=None):
         color_schema = self.params['color_schema']
         if color_tuple and len(color_tuple) == 3:
             color = pygame.Color(*color_tuple)
-        elif color_schema == 'PRIMARY':
-            _primary_color = random.choice(list(PRIMARY_COLORS.values()))
-            color = pygame.Color(*_primary_color)
-        elif color_schema == 'BLACK':
-            color = self.COLOR_BLACK
         else:
-            _random_color = random.choice(list(ALL_COLORS.values()))
-            color = pygame.Color(*_random_color)
+            color = random.choice(self.palettes.get(color_schema, self.palettes['ALL']))
         print(color)
         return color
 
+    def init_manifest(self):
+        # Only files that changed since the last launch get probed, everything else
+        # (including which files aren't loadable images at all) comes from the manifest
+        manifest = CardManifest.load(self.flashcard_dir)
+        if self.DEFAULT_RESCAN_MANIFEST or not len(manifest):
+            probed = manifest.rescan()
+            if probed:
+                manifest.save()
+            print("Flashcard manifest: {} cards, {} probed".format(len(manifest), probed))
+        return manifest
+
     def init_surface(self):
         self.surface = pygame.display.set_mode(self.size)
         #self.surface = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        # FULLSCREEN picks its own resolution, cached cards must match what we really got
+        self.size = self.width, self.height = self.surface.get_size()
+        self.card_cache.resize(self.size)
 
     def init_clock(self):
         self.clock = pygame.time.Clock()
 
-    def init_flashcards(self):
-        # flash_card_pile is a deque<Surface> objects
-        # if too many flashcards are used, the system freezes trying to load them all into memory
-        # quick and dirty subsampling
-        if len(self.flashcard_sources) > self.DEFAULT_SUBSAMPLE_SIZE:
-            try:
-                sources = set(random.sample(self.fresh_sources, self.DEFAULT_SUBSAMPLE_SIZE))
-                self.fresh_sources = self.fresh_sources - sources
-            except ValueError:
-                print("Not enough fresh flashcards left, exiting...")
-                sys.exit()
-
+    def _split_budget(self):
+        # (prefetched full size cards, scaled cards), together they add up to the card budget
+        prefetch_bytes = int(self.card_budget_bytes * self.DEFAULT_PREFETCH_BUDGET_SHARE)
+        return prefetch_bytes, self.card_budget_bytes - prefetch_bytes
+
+    def init_flashcards(self, budget_bytes=None):
+        # flash_card_pile is a list of flashcard source paths, the cards themselves are
+        # decoded on demand. budget_bytes bounds every card in memory: the CardStream holds
+        # the full size cards decoded ahead, the card cache the scaled ones being shown,
+        # the coldest cards get evicted as the new batch is prefetched
+        if budget_bytes is not None:
+            self.card_budget_bytes = budget_bytes
+        prefetch_bytes, cache_bytes = self._split_budget()
+        self.card_cache.resize_budget(cache_bytes)
+
+        sources = self.deck_sampler.draw(self.DEFAULT_SUBSAMPLE_SIZE)
+
+        if self.card_stream is None:
+            self.card_stream = CardStream(prefetch_bytes)
         else:
-            sources = self.flashcard_sources
+            self.card_stream.resize_budget(prefetch_bytes)
 
-        self.flash_card_pile = deque([pygame.image.load(s).convert() for s in sources])
+        self.flash_card_pile = list(sources)
+        self.upcoming_cards.clear()
         self.current_card_idx = 0
+        self.card_stream.prefetch(self.flash_card_pile[:1] + self._upcoming_sources())
+        stats = self.card_stream.stats()
+        cache_stats = self.card_cache.stats()
+        print("Card pool: {} cards resident, {:.1f} of {:.1f} MB, card cache: {} cards, {:.1f} of {:.1f} MB".format(
+            stats['cards'], stats['resident_bytes'] / 2 ** 20, stats['budget_bytes'] / 2 ** 20,
+            cache_stats['surfaces'], cache_stats['resident_bytes'] / 2 ** 20, self.card_cache.budget_bytes / 2 ** 20))
+
+    def init_alphabet_index(self):
+        # letter -> card source, checking a key press and finding its card are dict lookups
+        alphabet_index = dict()
+        for source in sorted(self.flashcard_sources):
+            letter = card_letter(source)
+            if letter and letter not in alphabet_index:
+                alphabet_index[letter] = source
+        return alphabet_index
 
     def change_mode(self, value, mode):
-        self.params['mode'] = mode
+        if mode == 'ALPHABET':
+            if not self.alphabet_index:
+                print("No alphabet flashcards found, staying in {} mode".format(self.params['mode']))
+                return
+            self.current_letter_idx = 0
+            self.params['mode'] = mode
+            # Get the first few letters decoded before the game starts
+            self.card_stream.prefetch([self.alphabet_index[self.alphabet[0]]] + self._upcoming_sources())
+        else:
+            self.params['mode'] = mode
         print(mode)
 
     def change_color_schema(self, value, color_schema):
@@ -306,7 +559,14 @@ def main():
     game = FlashcardGame()
     game.init_surface()
     game.init_clock()
-    game.init_flashcards()
+    # Machines with little memory to spare (or plenty of it) set their own card budget
+    budget_mb = os.environ.get("FLASHCARD_BUDGET_MB")
+    try:
+        budget_bytes = int(float(budget_mb) * 1024 * 1024) if budget_mb else None
+    except ValueError:
+        print("Ignoring FLASHCARD_BUDGET_MB={}, not a number of megabytes".format(budget_mb))
+        budget_bytes = None
+    game.init_flashcards(budget_bytes)
     game.init_menu()
     game.main()
 
@@ -7,6 +7,7 @@ import os
 import glob
 import random
 from consts import ALL_COLORS, PRIMARY_COLORS
+from core.assets import registry
 import random
 import math
 
@@ -21,7 +22,7 @@ starting_pos = (width / 2, height - 100)
 
 screen = pygame.display.set_mode(size)
 
-ball = pygame.image.load("static/intro_ball.gif")
+ball = registry.load("static/intro_ball.gif")
 ballrect = ball.get_rect(center=starting_pos)
 
 while 1:
@@ -1,7 +1,13 @@
 import pygame
 import random
-from core.utils import Player, Block, Projectile
+from core.utils import Player, Block, ProjectilePool
 from core.utils import SCREEN_HEIGHT, SCREEN_WIDTH, BLACK, WHITE, BLUE, RED
+from core.assets import registry
+from core.spatial_hash import SpatialHash
+from core.swarm import BlockSwarm
+
+# Number of enemy blocks, collisions go through a spatial hash so this can go into the thousands
+ENEMY_COUNT = 50
 
 
 # Initialize Pygame
@@ -9,14 +15,19 @@ pygame.init()
 
 screen = pygame.display.set_mode([SCREEN_WIDTH, SCREEN_HEIGHT])
 
-friendly_projectile_group = pygame.sprite.Group()
+# Every friendly projectile comes out of the pool and goes back to it, firing allocates nothing
+projectile_pool = ProjectilePool(capacity=256)
 
 enemy_block_group = pygame.sprite.Group()
 
-# This is a list of every sprite. All blocks and the player block as well.
+# This is a list of every sprite but the blocks and projectiles, those are moved and drawn by
+# the swarm and the projectile pool
 all_sprites_group = pygame.sprite.Group()
 
-for i in range(50):
+# Positions and velocities of every enemy block, moved all at once each frame
+enemy_swarm = BlockSwarm(ENEMY_COUNT)
+
+for i in range(ENEMY_COUNT):
     # This represents a block
     block = Block(RED)
 
@@ -34,12 +45,16 @@ for i in range(50):
 
     # Add the block to the list of objects
     enemy_block_group.add(block)
-    all_sprites_group.add(block)
+    enemy_swarm.add(block)
 
 
 player = Player()
 all_sprites_group.add(player)
 
+# Broad phase for every collision check against the enemy blocks
+enemy_grid = SpatialHash(cell_size=64)
+enemy_grid.rebuild(enemy_block_group)
+
 # Loop until the user clicks the close button.
 done = False
 
@@ -50,8 +65,7 @@ clock = pygame.time.Clock()
 kill_count = 0
 
 # set up background for scrolling
-background = pygame.image.load('static/background/seamless-bg2.jpg').convert()
-background = pygame.transform.scale(background, [SCREEN_WIDTH, SCREEN_HEIGHT*2])
+background = registry.load('static/background/seamless-bg2.jpg', size=[SCREEN_WIDTH, SCREEN_HEIGHT*2])
 y = 0
 
 # -------- Main Program Loop -----------
@@ -65,32 +79,36 @@ while not done:
             mouse_x = mouse_pos[0]
             mouse_y = mouse_pos[1]
 
-            projectile = Projectile(player.rect.x, player.rect.y, mouse_x, mouse_y)
-            projectile.rect.x = player.rect.x
-            projectile.rect.y = player.rect.y
-            friendly_projectile_group.add(projectile)
-            all_sprites_group.add(projectile)
+            projectile_pool.fire(player.rect.x, player.rect.y, mouse_x, mouse_y)
 
     # events are handled
     all_sprites_group.update()
+    projectile_pool.update()
+    enemy_swarm.step()
+    enemy_swarm.sync()
+    enemy_grid.update(enemy_swarm.crossed_cells(enemy_grid.cell_size))
 
     # check if friendly projectiles destroyed an enemy block
-    for _projectile in friendly_projectile_group:
+    for _projectile in projectile_pool.active:
+        # Retired by update() for leaving the screen, it's only collected below
+        if not _projectile.alive:
+            continue
 
-        block_hit_list = pygame.sprite.spritecollide(_projectile, enemy_block_group, True)
+        block_hit_list = enemy_grid.collide(_projectile, True)
 
         for block in block_hit_list:
-            friendly_projectile_group.remove(_projectile)
-            all_sprites_group.remove(_projectile)
+            enemy_swarm.remove(block)
+            projectile_pool.retire(_projectile)
             kill_count += 1
             print(kill_count)
 
-        if _projectile.rect.y < -10:
-            friendly_projectile_group.remove(_projectile)
-            all_sprites_group.remove(_projectile)
+    # Projectiles that hit something or left the screen go back to the pool
+    projectile_pool.collect()
 
     # check if enemy block hits player
-    player_hit = pygame.sprite.spritecollide(player, enemy_block_group, True)
+    player_hit = enemy_grid.collide(player, True)
+    for block in player_hit:
+        enemy_swarm.remove(block)
     if player_hit:
         print("You died!")
         done = True
@@ -110,6 +128,8 @@ while not done:
     pygame.draw.line(screen, (255, 0, 0), (0, rel_y), (SCREEN_WIDTH, rel_y), 3)
 
     # Draw all the spites
+    enemy_swarm.draw(screen)
+    projectile_pool.draw(screen)
     all_sprites_group.draw(screen)
 
     # Limit to 60 frames per second
@@ -1,12 +1,23 @@
 from __future__ import annotations
 import pygame
 import sys
-from typing import Dict, List, Optional
+import json
+import bisect
+import random
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from enum import Enum
 from pathlib import Path
 from dataclasses import dataclass
 from typing import Callable
 
+from baby_games.core.assets import registry
+from baby_games.core.telemetry import (QTE_KEY, QTE_PROMPT, QTE_SUCCESS, QTE_TIMEOUT,
+                                       Telemetry, qte_dtype)
+from baby_games.core.text_cache import text_cache
+from baby_games.core.word_trie import PrefixMatcher
+
 
 class FighterState(Enum):
     IDLE = "idle"
@@ -31,7 +42,7 @@ class MonsterState(Enum):
 @dataclass
 class QTEvent:
     position: int  # x position where event triggers
-    key: str  # key to press
+    key: str  # key to press, or the word to type in word levels ("" picks one from the word list)
     event_type: QTEventType  # type of event
     time_limit: int  # milliseconds to respond
     success_message: str  # message to display on success
@@ -58,75 +69,218 @@ class QTEvent:
         # Later we can add health system here
         print(self.fail_message)
 
+    @classmethod
+    def from_dict(cls, data: dict, headless: bool = False) -> QTEvent:
+        """Build an event from its entry in a level file, headless monsters get placeholder art"""
+        data = dict(data)
+        monster = data.pop("monster", None)
+        event = cls(**dict(data, event_type=QTEventType(data["event_type"])))
+        if monster:
+            event.sprite = QTESprite(event.position, monster.get("y", 400), monster.get("width", 80),
+                                     monster.get("height", 120), monster.get("type", "blue"),
+                                     scale=monster.get("scale", 1.0), headless=headless)
+        return event
+
+@dataclass
+class Level:
+    name: str
+    events: List[QTEvent]  # sorted by position
+    word_list: Optional[str] = None  # set for levels played by typing words
+
+def load_level(path: str, headless: bool = False) -> Level:
+    """Load a level file, events come back sorted by position"""
+    with open(path) as f:
+        level = json.load(f)
+    events = sorted((QTEvent.from_dict(e, headless) for e in level["events"]), key=lambda e: e.position)
+    return Level(level.get("name", Path(path).stem), events, level.get("word_list"))
+
+class WordList:
+    """Candidate words for word targets, bucketed by first letter"""
+    def __init__(self, words: List[str], rng: Optional[random.Random] = None):
+        self.by_letter: Dict[str, List[str]] = {}
+        for word in words:
+            self.by_letter.setdefault(word[0], []).append(word)
+        self.longest = max(map(len, words), default=0)
+        self.rng = rng or random.Random()
+
+    @classmethod
+    def load(cls, path: str) -> WordList:
+        with open(path) as f:
+            return cls([line.strip().lower() for line in f if line.strip()])
+
+    def pick(self, taken: set) -> str:
+        """A random word starting with a letter no active target starts with, if there is one left"""
+        letters = [letter for letter in self.by_letter if letter not in taken] or list(self.by_letter)
+        return self.rng.choice(self.by_letter[self.rng.choice(letters)])
+
+@lru_cache(maxsize=None)
+def load_atlas_layout(folder: Path) -> Optional[dict]:
+    """Frame rects per animation for the spritesheet.png in folder, None if there is no sheet"""
+    layout_path = Path("static/type_fighter/spritesheet_layout.json")
+    if not layout_path.exists():
+        return None
+    with open(layout_path) as f:
+        layout = json.load(f)
+    sheet_path = folder / layout["sheet"]
+    if not sheet_path.exists():
+        return None
+    return dict(layout, sheet=str(sheet_path))
+
+@lru_cache(maxsize=None)
+def load_sheet_size(path: str) -> Tuple[int, int]:
+    """Pixel size of a spritesheet, read from the decoded sheet"""
+    return registry.load(path, alpha=True).get_size()
+
 class SpriteSheet:
-    def __init__(self, frame_width: int, frame_height: int, sprite_paths: List[str] = None):
+    # Frame tables shared by every sprite using the same art,
+    # keyed by (asset set, state, size, scale)
+    _shared: Dict[tuple, SpriteSheet] = {}
+    # How many per-blit flips/scales the prebuilt frames have saved so far
+    transforms_saved = 0
+
+    def __init__(self, frame_width: int, frame_height: int, sprite_paths: List[str] = None,
+                 atlas: Optional[dict] = None, scale: float = 1.0):
         # Expects a list of paths to individual frame images
         # Example: ["static/type_fighter/Male/attack_r_0.png", 
         #          "static/type_fighter/Male/attack_r_1.png",
         #          "static/type_fighter/Male/attack_r_2.png"]
+        # With an atlas layout (see load_atlas_layout) the same frames are cut out of the
+        # folder's spritesheet.png instead, attack_r_1 being the 2nd rect of "attack_r"
         self.frame_width = frame_width
         self.frame_height = frame_height
-        self.frames: List[pygame.Surface] = []
+        # The frames are built at this scale of the sprite's size, drawing them skips a scale
+        self.scale = scale
+        frames: List[pygame.Surface] = []
         
-        if sprite_paths:
+        if sprite_paths and atlas:
+            frames = self._atlas_frames(atlas, sprite_paths)
+        elif sprite_paths:
             # Load actual sprite frames
             for path in sprite_paths:
                 try:
-                    image = pygame.image.load(str(path)).convert_alpha()  # Convert Path to string
-                    # Scale image if needed
-                    if image.get_width() != frame_width or image.get_height() != frame_height:
-                        image = pygame.transform.scale(image, (frame_width, frame_height))
-                    self.frames.append(image)
+                    # Decoded and scaled once, every sheet using the same frame shares it
+                    image = registry.load(path, alpha=True, size=(frame_width, frame_height))
+                    frames.append(image)
                 except pygame.error as e:
                     print(f"Could not load sprite: {path}, error: {e}")
                     # Create fallback colored rectangle
                     surface = pygame.Surface((frame_width, frame_height))
                     surface.fill((255, 0, 0))
-                    self.frames.append(surface)
+                    frames.append(surface)
         else:
             # Fallback to colored rectangles as before
             colors = [(255, 0, 0), (200, 0, 0), (150, 0, 0), (100, 0, 0)]
             for color in colors:
                 surface = pygame.Surface((frame_width, frame_height))
                 surface.fill(color)
-                self.frames.append(surface)
+                frames.append(surface)
+
+        # Immutable, sheets are shared between sprites
+        self.frames: Tuple[pygame.Surface, ...] = tuple(frames)
+        # Mirrored copies of the frames, keyed by flip_x
+        self._variants: Dict[bool, Tuple[pygame.Surface, ...]] = {False: self.frames}
+
+    def _atlas_frames(self, atlas: dict, sprite_paths: List[str]) -> List[pygame.Surface]:
+        # The whole sheet is decoded and scaled once, frames are subsurface views into it
+        rects = []
+        for path in sprite_paths:
+            animation, index = Path(path).stem.rsplit("_", 1)
+            rects.append(pygame.Rect(atlas["animations"][animation][int(index)]))
+        sheet_width, sheet_height = load_sheet_size(atlas["sheet"])
+
+        if len({rect.size for rect in rects}) == 1:
+            scale_x = self.frame_width / rects[0].width
+            scale_y = self.frame_height / rects[0].height
+            sheet = registry.load(atlas["sheet"], alpha=True,
+                                  size=(round(sheet_width * scale_x), round(sheet_height * scale_y)))
+            frames = [sheet.subsurface(pygame.Rect(round(rect.x * scale_x), round(rect.y * scale_y),
+                                                   self.frame_width, self.frame_height))
+                      for rect in rects]
+        else:
+            # Frames of different sizes can't share one scaled sheet, each is scaled on its own
+            sheet = registry.load(atlas["sheet"], alpha=True)
+            frames = [pygame.transform.scale(sheet.subsurface(rect), (self.frame_width, self.frame_height))
+                      for rect in rects]
+        # The full size decode was only needed for its size and to scale from
+        registry.discard(atlas["sheet"], alpha=True)
+        return frames
+
+    @classmethod
+    def shared(cls, asset_set: str, state: Enum, size: Tuple[int, int], scale: float,
+               sprite_paths: List[str], atlas: Optional[dict] = None,
+               headless: bool = False) -> SpriteSheet:
+        """Return the frame table for this art, loading it only the first time it is asked for.
+        Headless games (see type_fighter_sim) get placeholder frames instead of the art."""
+        key = (asset_set, state, size, scale, headless)
+        sheet = cls._shared.get(key)
+        if sheet is None:
+            sheet = cls(int(size[0] * scale), int(size[1] * scale),
+                        None if headless else sprite_paths, atlas, scale)
+            cls._shared[key] = sheet
+        return sheet
     
-    def get_frame(self, index: int) -> pygame.Surface:
+    def get_frame(self, index: int, flip_x: bool = False) -> pygame.Surface:
         if not self.frames:
             # Create an emergency fallback frame if no frames are loaded
             surface = pygame.Surface((self.frame_width, self.frame_height))
             surface.fill((255, 0, 0))
             return surface
+        frames = self._variants.get(flip_x)
+        if frames is None:
+            frames = self._build_variant(flip_x)
+        elif flip_x:
+            SpriteSheet.transforms_saved += 1
+        if self.scale != 1.0:
+            SpriteSheet.transforms_saved += 1
         # Ensure we don't get an index error by using modulo
-        return self.frames[index % len(self.frames)]
+        return frames[index % len(frames)]
+
+    def _build_variant(self, flip_x: bool) -> Tuple[pygame.Surface, ...]:
+        """Transform every frame once, draw calls then only blit"""
+        frames = tuple(pygame.transform.flip(frame, flip_x, False) for frame in self.frames)
+        self._variants[flip_x] = frames
+        return frames
 
 class Animation:
+    """Per sprite cursor into a shared SpriteSheet"""
     def __init__(self, sprite_sheet: SpriteSheet, frame_duration: int):
         self.sprite_sheet = sprite_sheet
         self.frame_duration = frame_duration  # milliseconds per frame
         self.current_frame = 0
-        self.last_update = 0
+        self.last_update: Optional[float] = None  # None until the first update after a reset
+
+    def reset(self):
+        """Start over at frame 0, timed from the next update"""
+        self.current_frame = 0
+        self.last_update = None
         
-    def update(self, current_time: int) -> pygame.Surface:
-        if current_time - self.last_update > self.frame_duration:
-            self.current_frame += 1
+    def update(self, current_time: float, flip_x: bool = False) -> pygame.Surface:
+        if self.last_update is None:
             self.last_update = current_time
+        # Advance as many frames as fit in the elapsed time, a slow frame doesn't slow the animation
+        elapsed = current_time - self.last_update
+        if elapsed >= self.frame_duration:
+            frames = int(elapsed // self.frame_duration)
+            self.current_frame += frames
+            self.last_update += frames * self.frame_duration
         
-        return self.sprite_sheet.get_frame(self.current_frame)
+        return self.sprite_sheet.get_frame(self.current_frame, flip_x)
 
 class Fighter:
-    def __init__(self, x: int, y: int, gender: str = "male"):
+    def __init__(self, x: int, y: int, gender: str = "male", headless: bool = False):
         self.gender = gender.lower()
+        self.headless = headless
         self.animations: Dict[FighterState, Animation] = {}
         self.setup_animations()
         
         self.current_state = FighterState.IDLE
         self.rect = pygame.Rect(x, y, 80, 120)
+        self.prev_y = y  # y before the last simulation step, for render interpolation
         self.moving = True
-        self.speed = 3
+        self.speed = 3  # per simulation step
         self.facing_right = True
         
-        # Add jump physics
+        # Add jump physics, per simulation step so the jump is the same at any frame rate
         self.initial_y = y  # Store initial y position
         self.y_velocity = 0
         self.jump_speed = -18  # Increased for higher jump
@@ -162,27 +316,31 @@ class Fighter:
                 80, 120, 100,
                 [base_path / self.gender / f"jump_{i}.png" for i in range(2)]  # your 2 jump frames
             ),
+            FighterState.HURT: (
+                80, 120, 150,
+                [base_path / self.gender / f"death_{i}.png" for i in range(2)]  # no hurt art, stagger with the first death frames
+            ),
         }
         
+        # Characters shipping a spritesheet.png load all frames with a single decode
+        atlas = load_atlas_layout(base_path / self.gender)
         for state, (width, height, duration, paths) in animation_data.items():
-            sprite_sheet = SpriteSheet(width, height, paths if paths else None)
+            sprite_sheet = SpriteSheet.shared(str(base_path / self.gender), state, (width, height), 1.0,
+                                              paths if paths else None, atlas, self.headless)
             self.animations[state] = Animation(sprite_sheet, duration)
     
     def set_state(self, new_state: FighterState):
         if self.current_state != new_state:
             self.current_state = new_state
             # Reset animation when state changes
-            self.animations[self.current_state].current_frame = 0
+            self.animations[self.current_state].reset()
     
-    def draw(self, screen: pygame.Surface):
-        current_time = pygame.time.get_ticks()
-        frame = self.animations[self.current_state].update(current_time)
-        
-        # Flip the frame if facing left
-        if not self.facing_right:
-            frame = pygame.transform.flip(frame, True, False)
-        
-        screen.blit(frame, self.rect)
+    def draw(self, screen: pygame.Surface, current_time: float, alpha: float = 1.0):
+        # Facing left uses the pre-flipped frames
+        frame = self.animations[self.current_state].update(current_time, flip_x=not self.facing_right)
+        # Draw between the previous and current simulation step
+        y = self.prev_y + (self.rect.y - self.prev_y) * alpha
+        screen.blit(frame, (self.rect.x, y))
     
     def jump(self):
         if not self.is_jumping:  # Only jump if not already jumping
@@ -191,6 +349,7 @@ class Fighter:
             self.set_state(FighterState.JUMP)
 
     def update_physics(self):
+        self.prev_y = self.rect.y
         if self.is_jumping:
             # Apply gravity
             self.y_velocity += self.gravity
@@ -223,7 +382,9 @@ class Fighter:
         # after the attack animation completes
 
 class QTESprite:
-    def __init__(self, x: int, y: int, width: int, height: int, monster_type: str = "blue", scale: float = 1.0):
+    def __init__(self, x: int, y: int, width: int, height: int, monster_type: str = "blue", scale: float = 1.0,
+                 headless: bool = False):
+        self.headless = headless
         # Apply scale to width and height
         self.scale = scale
         self.original_width = width
@@ -258,95 +419,102 @@ class QTESprite:
         }
         
         for state, (width, height, duration, paths) in animation_data.items():
-            sprite_sheet = SpriteSheet(width, height, paths)
+            # Frames come pre-scaled, so draw is a plain blit
+            sprite_sheet = SpriteSheet.shared(str(base_path), state, (width, height),
+                                              self.scale, paths, headless=self.headless)
             self.animations[state] = Animation(sprite_sheet, duration)
     
     def set_state(self, new_state: MonsterState):
         if self.state != new_state:
             self.state = new_state
             # Reset animation when state changes
-            self.animations[self.state].current_frame = 0
+            self.animations[self.state].reset()
     
-    def draw(self, screen: pygame.Surface):
-        current_time = pygame.time.get_ticks()
+    def draw(self, screen: pygame.Surface, current_time: float):
         frame = self.animations[self.state].update(current_time)
-        
-        # Scale the frame if needed
-        if self.scale != 1.0:
-            frame = pygame.transform.scale(frame, (self.scaled_width, self.scaled_height))
-        
         screen.blit(frame, self.rect)
 
+DEFAULT_LEVEL = "static/type_fighter/levels/level_1.json"
+DEFAULT_TELEMETRY_DIR = "telemetry/type_fighter"
+
 class TypeFighter:
-    def __init__(self):
-        pygame.init()
+    # The simulation always advances in fixed steps, rendering runs at whatever rate it can
+    SIM_STEP_MS = 1000 / 60
+    # Longest frame we catch up on, so a stall doesn't turn into a burst of steps
+    MAX_FRAME_MS = 250
+
+    def __init__(self, level_path: str = DEFAULT_LEVEL, max_fps: int = 60, headless: bool = False,
+                 telemetry_dir: Optional[str] = DEFAULT_TELEMETRY_DIR):
         self.screen_size = (800, 600)
-        self.screen = pygame.display.set_mode(self.screen_size)
-        pygame.display.set_caption("Type Fighter")
+        self.headless = headless
+        if headless:
+            # No window and no art, only the game logic driven through step()
+            self.screen = None
+        else:
+            pygame.init()
+            self.screen = pygame.display.set_mode(self.screen_size)
+            pygame.display.set_caption("Type Fighter")
         
         # Center the fighter horizontally
-        self.fighter = Fighter(self.screen_size[0] // 3, 400)  # Lowered by 300 pixels
+        self.fighter = Fighter(self.screen_size[0] // 3, 400, headless=headless)  # Lowered by 300 pixels
 
-        self.font = pygame.font.Font(None, 36)
+        self.font_size = 36
+        self.word_font_size = 28
         
         # World offset tracks total movement
         self.world_offset = 0
+        self.prev_world_offset = 0
+
+        # Simulation clock in ms, advances by SIM_STEP_MS per step
+        self.sim_time = 0.0
+        self.max_fps = max_fps
         
         # Background (we'll need two copies to create infinite scroll)
-        try:
-            self.background = pygame.image.load("static/type_fighter/background.jpg").convert()
-            self.background = pygame.transform.scale(self.background, (self.screen_size[0], self.screen_size[1]))
-        except pygame.error:
-            self.background = pygame.Surface(self.screen_size)
-            self.background.fill((20, 20, 50))  # Dark blue-gray fallback
+        if headless:
+            self.background = None
+        else:
+            try:
+                self.background = registry.load("static/type_fighter/background.jpg", size=self.screen_size)
+            except pygame.error:
+                self.background = pygame.Surface(self.screen_size)
+                self.background.fill((20, 20, 50))  # Dark blue-gray fallback
         
-        self.background_width = self.background.get_width()
-        self.background_x = 0
+        self.background_width = self.background.get_width() if self.background else self.screen_size[0]
         
         self.clock = pygame.time.Clock()
         
-        # Define the sequence of quick time events
-        self.qt_events = [
-            QTEvent(
-                position=700,
-                key='a',
-                event_type=QTEventType.ATTACK,
-                time_limit=2000,
-                success_message="First strike!",
-                fail_message="Missed the opening!",
-                damage_on_fail=10,
-                trigger_distance=70,
-                sprite=QTESprite(700, 400, 80, 120, "blue", scale=0.5)
-            ),
-            QTEvent(
-                position=1400,
-                key='j',
-                event_type=QTEventType.JUMP,
-                time_limit=1500,
-                success_message="Aerial maneuver!",
-                fail_message="Couldn't get airborne!",
-                damage_on_fail=15,
-                trigger_distance=70,
-                sprite=QTESprite(1400, 400, 80, 120, "blue", scale=0.5)
-            ),
-            QTEvent(
-                position=2000,
-                key='k',
-                event_type=QTEventType.ATTACK,
-                time_limit=2000,
-                success_message="Finishing blow!",
-                fail_message="Failed to finish!",
-                damage_on_fail=20,
-                trigger_distance=70,
-                sprite=QTESprite(2000, 400, 80, 120, "blue", scale=0.5)
-            ),
-        ]
+        # The sequence of quick time events, sorted by position. Drawing only looks at the
+        # events inside the visible world range, found by bisecting their positions.
+        level = load_level(level_path, headless)
+        self.qt_events = level.events
+        self.event_positions = [event.position for event in self.qt_events]
+        self.max_sprite_width = max((event.sprite.rect.width for event in self.qt_events if event.sprite), default=0)
         self.current_event_index = 0
         
         # Prompt state
         self.waiting_for_input = False
         self.current_event: Optional[QTEvent] = None
+        self.current_target = -1  # index of current_event in qt_events
         self.prompt_start_time = 0
+
+        # Word levels: every event coming on screen becomes a target with a word, typed
+        # characters are matched against all of them at once. Targets are event indices.
+        self.word_list = WordList.load(level.word_list) if level.word_list else None
+        self.matcher = PrefixMatcher()
+        self.spawn_index = 0
+        self.defeated: set = set()
+
+        # Outcome per event index, True when beaten and False when it ran out of time
+        self.results: Dict[int, bool] = {}
+        self.mistakes = 0  # wrong keys pressed at a prompt, or typos in word levels
+
+        # Every prompt, key, timeout and success goes to telemetry, headless runs don't record
+        # The key column is as wide as the longest key or word this level can ask for
+        key_width = max([len(event.key) for event in self.qt_events] +
+                        [self.word_list.longest if self.word_list else 0])
+        self.telemetry = (Telemetry(telemetry_dir, qte_dtype(key_width))
+                          if telemetry_dir and not headless else None)
+        self.shown_at: Dict[int, float] = {}  # event index -> game time its prompt was shown
         
         # Animation state
         self.animation_timer = 0
@@ -356,22 +524,78 @@ class TypeFighter:
         if self.animation_complete and self.fighter.moving:
             # Instead of moving fighter, move the world
             self.world_offset += self.fighter.speed
-            
-            # Update background position
-            self.background_x -= self.fighter.speed
-            # Reset background position when it moves off screen
-            if self.background_x <= -self.background_width:
-                self.background_x = 0
 
-    def draw_background(self):
-        # Draw two copies of the background side by side
-        self.screen.blit(self.background, (self.background_x, 0))
-        self.screen.blit(self.background, (self.background_x + self.background_width, 0))
+    def visible_range(self) -> Tuple[int, int]:
+        """Index range of the upcoming events whose sprite can be on screen"""
+        left = bisect.bisect_left(self.event_positions, self.world_offset - self.max_sprite_width)
+        right = bisect.bisect_right(self.event_positions, self.world_offset + self.screen_size[0])
+        return max(left, self.current_event_index), right
+
+    def visible_events(self) -> List[QTEvent]:
+        """Upcoming events whose sprite can be on screen, without walking the whole level"""
+        return self.qt_events[slice(*self.visible_range())]
+
+    def spawn_targets(self):
+        """Give every event coming on screen its word and make it typeable"""
+        while (self.spawn_index < len(self.qt_events) and
+               self.qt_events[self.spawn_index].position - self.world_offset <= self.screen_size[0]):
+            event = self.qt_events[self.spawn_index]
+            if not event.key:
+                event.key = self.word_list.pick(self.matcher.first_chars())
+            self.matcher.add(event.key, self.spawn_index)
+            self.record(QTE_PROMPT, self.spawn_index)
+            self.spawn_index += 1
+
+    def type_char(self, char: str):
+        typed = len(self.matcher.typed)
+        target = self.matcher.feed(char)
+        if target is None:
+            correct = len(self.matcher.typed) == typed + 1
+            if not correct:
+                self.mistakes += 1
+            # Reaction is measured against the word the key went towards
+            matching = self.matcher.matching()
+            self.record(QTE_KEY, min(matching) if matching else -1, char, correct)
+            return
+        self.record(QTE_KEY, target, char, True)
+        if self.waiting_for_input and target == self.current_target:
+            self.handle_event_success()
+        else:
+            # Typed ahead, the monster is beaten before the fighter gets to it
+            self.defeated.add(target)
+            self.results[target] = True
+            self.record(QTE_SUCCESS, target)
+            event = self.qt_events[target]
+            if event.sprite:
+                event.sprite.set_state(MonsterState.HURT)
+            print(event.success_message)
+
+    def draw_target_word(self, target: int, sprite: QTESprite):
+        """Draw the word above a target, the part typed so far highlighted"""
+        word = self.matcher.word(target)
+        if word is None:
+            return
+        typed = len(self.matcher.typed) if target in self.matcher.matching() else 0
+        done = text_cache.render(word[:typed], self.word_font_size, (255, 220, 0)) if typed else None
+        rest = text_cache.render(word[typed:], self.word_font_size)
+        width = rest.get_width() + (done.get_width() if done else 0)
+        x = sprite.rect.centerx - width // 2
+        y = sprite.rect.top - rest.get_height() - 10
+        if done:
+            self.screen.blit(done, (x, y))
+            x += done.get_width()
+        self.screen.blit(rest, (x, y))
+
+    def draw_background(self, world_offset: float):
+        # Draw two copies of the background side by side, wrapping every background width
+        background_x = -(world_offset % self.background_width)
+        self.screen.blit(self.background, (background_x, 0))
+        self.screen.blit(self.background, (background_x + self.background_width, 0))
 
     def show_prompt(self, event: QTEvent):
         self.waiting_for_input = True
         self.current_event = event
-        self.prompt_start_time = pygame.time.get_ticks()
+        self.prompt_start_time = self.sim_time
         self.fighter.moving = False
         self.fighter.set_state(FighterState.TYPING)
         
@@ -379,31 +603,29 @@ class TypeFighter:
         if not self.waiting_for_input or not self.current_event:
             return False
         
-        elapsed = pygame.time.get_ticks() - self.prompt_start_time
+        elapsed = self.sim_time - self.prompt_start_time
         return elapsed > self.current_event.time_limit
     
     def draw_prompt(self):
         if self.waiting_for_input and self.current_event:
-            # Draw the event type
-            event_text = self.font.render(
-                f"{self.current_event.event_type.value.upper()}: Press {self.current_event.key}", 
-                True, 
-                (255, 255, 255)
+            # Draw the event type, rendered once per prompt and blitted from the cache after that
+            action = "Type" if self.word_list else "Press"
+            text_cache.draw(
+                self.screen,
+                f"{self.current_event.event_type.value.upper()}: {action} {self.current_event.key}",
+                (self.screen_size[0] // 2, 100),
+                self.font_size
             )
-            text_rect = event_text.get_rect(center=(self.screen_size[0] // 2, 100))
-            self.screen.blit(event_text, text_rect)
             
-            # Draw time remaining
-            elapsed = pygame.time.get_ticks() - self.prompt_start_time
+            # Draw time remaining, the digits come from the glyph atlas
+            elapsed = self.sim_time - self.prompt_start_time
             remaining = max(0, (self.current_event.time_limit - elapsed) / 1000)
-            timer = self.font.render(f"Time: {remaining:.1f}", True, (255, 255, 255))
-            timer_rect = timer.get_rect(center=(self.screen_size[0] // 2, 150))
-            self.screen.blit(timer, timer_rect)
+            text_cache.draw_number(self.screen, f"{remaining:.1f}", (self.screen_size[0] // 2, 150),
+                                   label="Time: ", size=self.font_size)
     
     def handle_animation_completion(self):
         """Handle the completion of an animation and return to appropriate state"""
-        current_time = pygame.time.get_ticks()
-        if not self.animation_complete and current_time >= self.animation_timer:
+        if not self.animation_complete and self.sim_time >= self.animation_timer:
             self.animation_complete = True
             self.fighter.moving = True  # Ensure movement is enabled after animation
             # Don't force state change if jumping
@@ -416,7 +638,7 @@ class TypeFighter:
     def start_animation(self, duration: int):
         """Start an animation with a specific duration"""
         self.animation_complete = False
-        self.animation_timer = pygame.time.get_ticks() + duration
+        self.animation_timer = self.sim_time + duration
 
     def handle_event_success(self):
         """Handle successful QTE completion"""
@@ -424,6 +646,8 @@ class TypeFighter:
             return
 
         print(self.current_event.success_message)
+        self.results[self.current_target] = True
+        self.record(QTE_SUCCESS, self.current_target)
         
         # Execute the event action
         self.current_event.execute_success(self.fighter)
@@ -440,74 +664,142 @@ class TypeFighter:
         self.current_event = None
         self.fighter.moving = True  # Ensure fighter resumes movement after animation
 
+    def handle_input(self, event: pygame.event.EventType):
+        if event.type == pygame.KEYDOWN and self.word_list:
+            # Typos only cost the word in progress, running out of time is the penalty
+            if event.unicode and event.unicode.isprintable():
+                self.type_char(event.unicode.lower())
+        elif event.type == pygame.KEYDOWN:
+            if self.waiting_for_input and self.current_event:
+                correct = event.unicode == self.current_event.key
+                self.record(QTE_KEY, self.current_target, event.unicode[:1], correct)
+                if correct:
+                    self.handle_event_success()
+                else:
+                    self.mistakes += 1
+                    self.current_event.execute_failure(self.fighter)
+                    self.start_animation(self.fighter.animations[FighterState.HURT].frame_duration * 2)
+
+    def record(self, kind: int, index: int, pressed: str = "", correct: bool = False):
+        """Record a quick time event row, only a write into the telemetry ring buffer"""
+        if self.telemetry is None:
+            return
+        if kind == QTE_PROMPT:
+            self.shown_at[index] = self.sim_time
+        event = self.qt_events[index] if index >= 0 else None
+        reaction = self.sim_time - self.shown_at[index] if index in self.shown_at and kind != QTE_PROMPT else float("nan")
+        self.telemetry.record((time.time(), self.sim_time, kind, index,
+                               event.event_type.value if event else "", event.key if event else "",
+                               pressed, correct, reaction))
+
+    def finished(self) -> bool:
+        """Every event of the level has been played"""
+        return self.current_event_index >= len(self.qt_events) and not self.waiting_for_input
+
+    def step(self):
+        """Advance the simulation by one fixed step of SIM_STEP_MS"""
+        self.sim_time += self.SIM_STEP_MS
+        self.prev_world_offset = self.world_offset
+
+        # Handle animation completion
+        self.handle_animation_completion()
+
+        if self.word_list:
+            self.spawn_targets()
+            # Monsters beaten by typing ahead don't stop the fighter
+            while self.current_event_index in self.defeated:
+                self.current_event_index += 1
+        
+        # Only check for new events if not waiting and animation is complete
+        if (not self.waiting_for_input and 
+            self.animation_complete and
+            self.current_event_index < len(self.qt_events) and 
+            self.world_offset >= self.qt_events[self.current_event_index].position - self.fighter.rect.x - self.qt_events[self.current_event_index].trigger_distance):
+            self.show_prompt(self.qt_events[self.current_event_index])
+            self.current_target = self.current_event_index
+            if not self.word_list:
+                self.record(QTE_PROMPT, self.current_target)
+            self.current_event_index += 1
+        
+        # Check for timeout
+        if self.check_prompt_timeout() and self.current_event:
+            self.current_event.execute_failure(self.fighter)
+            self.start_animation(self.fighter.animations[FighterState.HURT].frame_duration * 2)
+            self.matcher.remove(self.current_target)
+            self.results[self.current_target] = False
+            self.record(QTE_TIMEOUT, self.current_target)
+            self.waiting_for_input = False
+            self.current_event = None
+        
+        # Update world position instead of moving fighter
+        self.update_world()
+        
+        # Update fighter physics regardless of movement state
+        self.fighter.update_physics()
+
+    def render(self, alpha: float):
+        """Draw the world interpolated alpha of the way from the previous to the current step"""
+        world_offset = self.prev_world_offset + (self.world_offset - self.prev_world_offset) * alpha
+        self.draw_background(world_offset)
+        
+        # Draw the remaining QTE sprites in view (adjusted for world offset)
+        for index in range(*self.visible_range()):
+            event = self.qt_events[index]
+            if event.sprite:
+                # Adjust sprite position based on world offset
+                sprite_screen_x = event.position - world_offset
+                event.sprite.rect.x = sprite_screen_x
+                # Only draw if on screen
+                if -event.sprite.rect.width <= sprite_screen_x <= self.screen_size[0]:
+                    event.sprite.draw(self.screen, self.sim_time)
+                    if self.word_list:
+                        self.draw_target_word(index, event.sprite)
+        
+        # Draw the current QTE sprite if there is one
+        if self.waiting_for_input and self.current_event and self.current_event.sprite:
+            sprite_screen_x = self.current_event.position - world_offset
+            self.current_event.sprite.rect.x = sprite_screen_x
+            if -self.current_event.sprite.rect.width <= sprite_screen_x <= self.screen_size[0]:
+                self.current_event.sprite.draw(self.screen, self.sim_time)
+                if self.word_list:
+                    self.draw_target_word(self.current_target, self.current_event.sprite)
+        
+        self.fighter.draw(self.screen, self.sim_time, alpha)
+        self.draw_prompt()
+        
+        pygame.display.flip()
+
     def main(self):
         running = True
+        start_time = pygame.time.get_ticks()
+        accumulator = 0.0
         while running:
+            # Rendering is capped at max_fps, the simulation catches up in fixed steps
+            accumulator += min(self.clock.tick(self.max_fps), self.MAX_FRAME_MS)
+
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
-                elif event.type == pygame.KEYDOWN:
-                    if self.waiting_for_input and self.current_event:
-                        if event.unicode == self.current_event.key:
-                            self.handle_event_success()
-                        else:
-                            self.current_event.execute_failure(self.fighter)
-                            self.start_animation(self.fighter.animations[FighterState.HURT].frame_duration * 2)
-            
-            # Handle animation completion
-            self.handle_animation_completion()
-            
-            # Only check for new events if not waiting and animation is complete
-            if (not self.waiting_for_input and 
-                self.animation_complete and
-                self.current_event_index < len(self.qt_events) and 
-                self.world_offset >= self.qt_events[self.current_event_index].position - self.fighter.rect.x - self.qt_events[self.current_event_index].trigger_distance):
-                self.show_prompt(self.qt_events[self.current_event_index])
-                self.current_event_index += 1
-            
-            # Check for timeout
-            if self.check_prompt_timeout() and self.current_event:
-                self.current_event.execute_failure(self.fighter)
-                self.start_animation(self.fighter.animations[FighterState.HURT].frame_duration * 2)
-                self.waiting_for_input = False
-                self.current_event = None
-            
-            # Update world position instead of moving fighter
-            self.update_world()
-            
-            # Update fighter physics regardless of movement state
-            self.fighter.update_physics()
-            
-            # Draw
-            self.draw_background()
-            
-            # Draw all remaining QTE sprites (adjusted for world offset)
-            for event in self.qt_events[self.current_event_index:]:
-                if event.sprite:
-                    # Adjust sprite position based on world offset
-                    sprite_screen_x = event.position - self.world_offset
-                    event.sprite.rect.x = sprite_screen_x
-                    # Only draw if on screen
-                    if -event.sprite.rect.width <= sprite_screen_x <= self.screen_size[0]:
-                        event.sprite.draw(self.screen)
-            
-            # Draw the current QTE sprite if there is one
-            if self.waiting_for_input and self.current_event and self.current_event.sprite:
-                sprite_screen_x = self.current_event.position - self.world_offset
-                self.current_event.sprite.rect.x = sprite_screen_x
-                if -self.current_event.sprite.rect.width <= sprite_screen_x <= self.screen_size[0]:
-                    self.current_event.sprite.draw(self.screen)
+                else:
+                    self.handle_input(event)
             
-            self.fighter.draw(self.screen)
-            self.draw_prompt()
+            while accumulator >= self.SIM_STEP_MS:
+                self.step()
+                accumulator -= self.SIM_STEP_MS
             
-            pygame.display.flip()
-            self.clock.tick(60)
+            self.render(accumulator / self.SIM_STEP_MS)
         
+        elapsed = max(1, pygame.time.get_ticks() - start_time) / 1000
+        print(f"Prebuilt sprite frames saved {SpriteSheet.transforms_saved} transforms "
+              f"({SpriteSheet.transforms_saved / elapsed:.0f}/s)")
+        if self.telemetry:
+            self.telemetry.close()
+            if self.telemetry.dropped:
+                print(f"Telemetry dropped {self.telemetry.dropped} rows")
         pygame.quit()
 
 def main():
-    game = TypeFighter()
+    game = TypeFighter(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_LEVEL)
     game.main()
 
 if __name__ == "__main__":
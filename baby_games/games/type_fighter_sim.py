@@ -0,0 +1,164 @@
+"""Play TypeFighter levels headless with simulated typists, to tune time limits and distances.
+
+Every run builds a headless TypeFighter (no window, no art) and drives it through
+step() on its own simulation clock as fast as the CPU allows. A simulated typist
+reacts to prompts after a random delay and presses the right key with some accuracy,
+in word levels it types the nearest target's word a character at a time. Runs are
+spread over a process pool and reported as success rates per event.
+
+    python -m baby_games.games.type_fighter_sim static/type_fighter/levels/level_1.json --runs 2000
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import random
+import string
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+from baby_games.games.type_fighter import DEFAULT_LEVEL, TypeFighter, load_level
+
+# Give up on a run that hasn't finished after this much simulated time
+MAX_SIM_MS = 10 * 60 * 1000
+
+
+@dataclass(frozen=True)
+class Typist:
+    name: str
+    reaction_ms: float  # mean time from a prompt (or a new word) to the first key
+    reaction_sd_ms: float
+    accuracy: float  # chance each key pressed is the right one
+    key_interval_ms: float = 250  # time between keys within a word
+
+    def reaction(self, rng: random.Random) -> float:
+        return max(50.0, rng.gauss(self.reaction_ms, self.reaction_sd_ms))
+
+    def press(self, rng: random.Random, wanted: str) -> str:
+        if rng.random() < self.accuracy:
+            return wanted
+        return rng.choice([c for c in string.ascii_lowercase if c != wanted])
+
+
+TYPISTS = [
+    Typist("quick", 500, 150, 0.95, 150),
+    Typist("steady", 900, 250, 0.9, 300),
+    Typist("learning", 1400, 400, 0.8, 500),
+    Typist("toddler", 2200, 700, 0.6, 900),
+]
+
+
+def key_event(char: str) -> pygame.event.Event:
+    return pygame.event.Event(pygame.KEYDOWN, key=0, unicode=char, mod=0)
+
+
+def simulate_run(level_path: str, typist: Typist, seed: int) -> Tuple[Dict[int, bool], int]:
+    """Play one level to the end, returns the outcome per event and the mistakes made"""
+    rng = random.Random(seed)
+    game = TypeFighter(level_path, headless=True)
+    if game.word_list:
+        game.word_list.rng.seed(seed)
+
+    next_key_time: Optional[float] = None
+    target = None
+    while not game.finished() and game.sim_time < MAX_SIM_MS:
+        game.step()
+
+        if game.word_list:
+            # Go after the nearest target, reacting anew whenever it changes
+            nearest = min(game.matcher.targets(), default=None)
+            if nearest != target:
+                target = nearest
+                next_key_time = None if nearest is None else game.sim_time + typist.reaction(rng)
+            if next_key_time is not None and game.sim_time >= next_key_time:
+                word = game.matcher.word(target)
+                typed = len(game.matcher.typed) if target in game.matcher.matching() else 0
+                game.handle_input(key_event(typist.press(rng, word[typed])))
+                next_key_time = game.sim_time + typist.key_interval_ms
+        else:
+            if game.waiting_for_input and game.current_target != target:
+                target = game.current_target
+                next_key_time = game.sim_time + typist.reaction(rng)
+            if game.waiting_for_input and next_key_time is not None and game.sim_time >= next_key_time:
+                game.handle_input(key_event(typist.press(rng, game.current_event.key)))
+                # A wrong key gets another try after a fresh look at the prompt
+                next_key_time = game.sim_time + typist.reaction(rng)
+
+    return game.results, game.mistakes
+
+
+def simulate_batch(level_path: str, typist: Typist, seeds: List[int]) -> Tuple[str, List[int], List[int], int]:
+    """Worker: plays a batch of runs, returns (typist, successes per event, plays per event, mistakes)"""
+    events = len(load_level(level_path, headless=True).events)
+    successes = [0] * events
+    played = [0] * events
+    mistakes = 0
+    # The game prints every success and failure, thousands of runs don't need that
+    with contextlib.redirect_stdout(io.StringIO()):
+        for seed in seeds:
+            results, run_mistakes = simulate_run(level_path, typist, seed)
+            for index, success in results.items():
+                played[index] += 1
+                successes[index] += success
+            mistakes += run_mistakes
+    return typist.name, successes, played, mistakes
+
+
+def simulate(level_path: str, runs: int, typists: List[Typist] = TYPISTS, batch_size: int = 50,
+             workers: Optional[int] = None, seed: int = 0):
+    # Only the event list is needed here, not the monsters' art
+    level = load_level(level_path, headless=True)
+    totals = {t.name: ([0] * len(level.events), [0] * len(level.events), [0]) for t in typists}
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for typist_index, typist in enumerate(typists):
+            for first in range(0, runs, batch_size):
+                seeds = [seed + typist_index * runs + i for i in range(first, min(first + batch_size, runs))]
+                futures.append(pool.submit(simulate_batch, level_path, typist, seeds))
+
+        for future in as_completed(futures):
+            name, successes, played, mistakes = future.result()
+            total_successes, total_played, total_mistakes = totals[name]
+            for index in range(len(level.events)):
+                total_successes[index] += successes[index]
+                total_played[index] += played[index]
+            total_mistakes[0] += mistakes
+    elapsed = time.perf_counter() - start
+
+    print(f"{level.name}: {runs} runs per typist, {len(typists)} typists")
+    header = "event".ljust(32) + "".join(t.name.rjust(10) for t in typists)
+    print(header)
+    for index, event in enumerate(level.events):
+        label = f"{index} {event.event_type.value} '{event.key or '<word>'}' {event.time_limit}ms/{event.trigger_distance}px"
+        rates = []
+        for typist in typists:
+            successes, played, _ = totals[typist.name]
+            rates.append(f"{successes[index] / played[index]:.0%}" if played[index] else "-")
+        print(label[:31].ljust(32) + "".join(rate.rjust(10) for rate in rates))
+    print("mistakes/run".ljust(32) + "".join(f"{totals[t.name][2][0] / runs:.1f}".rjust(10) for t in typists))
+
+    total_runs = runs * len(typists)
+    print(f"Simulated {total_runs} runs in {elapsed:.1f}s ({total_runs / elapsed:.0f} runs/s)")
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a TypeFighter level headless with simulated typists")
+    parser.add_argument('level', nargs='?', default=DEFAULT_LEVEL)
+    parser.add_argument('--runs', type=int, default=1000, help="runs per typist")
+    parser.add_argument('--batch-size', type=int, default=50, help="runs each worker plays at a time")
+    parser.add_argument('--workers', type=int, default=None, help="defaults to the number of CPUs")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    simulate(args.level, args.runs, batch_size=args.batch_size, workers=args.workers, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()